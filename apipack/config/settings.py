@@ -1,12 +1,71 @@
 """
 Settings and configuration management for APIpack.
+
+Settings are plain frozen dataclasses populated once per process from
+``APIPACK_``-prefixed environment variables. Nested sections are addressed
+with a ``__`` delimiter, e.g. ``APIPACK_LLM__TEMPERATURE=0.2``.
 """
-from typing import Dict, Any, Optional, List
-from pathlib import Path
-from pydantic import BaseModel, Field, validator
+import functools
+import logging
+import os
+import sys
+from dataclasses import dataclass, fields, is_dataclass, replace
+from typing import Dict, Any, Optional, Mapping, Tuple, get_origin
+
+logger = logging.getLogger(__name__)
+
+ENV_PREFIX = "APIPACK_"
+ENV_NESTED_DELIMITER = "__"
+
+# ``slots`` is only understood by dataclasses on Python 3.10+.
+_DATACLASS_OPTIONS: Dict[str, Any] = (
+    {"frozen": True, "slots": True} if sys.version_info >= (3, 10) else {"frozen": True}
+)
+
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
+
+
+def _coerce(value: str, annotation: Any) -> Any:
+    """Convert a raw environment string to the annotated field type."""
+    if annotation is bool:
+        return value.strip().lower() in _TRUE_VALUES
+    if annotation in (int, float):
+        return annotation(value)
+    origin = get_origin(annotation)
+    if origin in (list, tuple):
+        return origin(item.strip() for item in value.split(",") if item.strip())
+    return value
+
+
+def _build(cls: type, values: Mapping[str, Any]) -> Any:
+    """Instantiate a settings dataclass from a (possibly nested) mapping.
+
+    Values whose shape doesn't fit the field -- a scalar for a nested
+    section, or a section for a scalar field -- are skipped with a warning.
+    """
+    kwargs = {}
+    for f in fields(cls):
+        if f.name not in values:
+            continue
+        raw = values[f.name]
+        if is_dataclass(f.type):
+            if isinstance(raw, Mapping):
+                kwargs[f.name] = _build(f.type, raw)
+            elif isinstance(raw, f.type):
+                kwargs[f.name] = raw
+            else:
+                logger.warning("Ignoring value for settings section %r: %r", f.name, raw)
+        elif isinstance(raw, Mapping):
+            logger.warning("Ignoring nested values for settings field %r: %r", f.name, raw)
+        elif isinstance(raw, str):
+            kwargs[f.name] = _coerce(raw, f.type)
+        else:
+            kwargs[f.name] = raw
+    return cls(**kwargs)
 
 
-class LLMSettings(BaseModel):
+@dataclass(**_DATACLASS_OPTIONS)
+class LLMSettings:
     """Settings for LLM configuration."""
     model_name: str = "mistral:7b"
     temperature: float = 0.7
@@ -15,15 +74,15 @@ class LLMSettings(BaseModel):
     timeout: int = 300
 
 
-class TemplateSettings(BaseModel):
+@dataclass(**_DATACLASS_OPTIONS)
+class TemplateSettings:
     """Settings for template configuration."""
-    template_dirs: List[str] = Field(
-        default_factory=lambda: ["templates"]
-    )
+    template_dirs: Tuple[str, ...] = ("templates",)
     auto_discover: bool = True
 
 
-class GenerationSettings(BaseModel):
+@dataclass(**_DATACLASS_OPTIONS)
+class GenerationSettings:
     """Settings for code generation."""
     output_dir: str = "generated"
     validate_code: bool = True
@@ -31,44 +90,87 @@ class GenerationSettings(BaseModel):
     overwrite: bool = False
 
 
-class Settings(BaseModel):
+# Sections are frozen and hold only immutable values, so every Settings
+# instance can share the same default objects instead of building new ones.
+_DEFAULT_LLM = LLMSettings()
+_DEFAULT_TEMPLATES = TemplateSettings()
+_DEFAULT_GENERATION = GenerationSettings()
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class Settings:
     """Main settings class for APIpack."""
-    llm: LLMSettings = Field(default_factory=LLMSettings)
-    templates: TemplateSettings = Field(default_factory=TemplateSettings)
-    generation: GenerationSettings = Field(default_factory=GenerationSettings)
+    llm: LLMSettings = _DEFAULT_LLM
+    templates: TemplateSettings = _DEFAULT_TEMPLATES
+    generation: GenerationSettings = _DEFAULT_GENERATION
     debug: bool = False
     log_level: str = "INFO"
 
-    class Config:
-        env_file = ".env"
-        env_nested_delimiter = "__"
-        env_prefix = "apipack_"
-        case_sensitive = True
+    @classmethod
+    def _from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "Settings":
+        """Build settings from ``APIPACK_`` environment variables.
+
+        Args:
+            environ: Mapping to read from. Defaults to ``os.environ``.
+
+        Returns:
+            Settings: A settings tree with environment overrides applied
+        """
+        environ = os.environ if environ is None else environ
+        values: Dict[str, Any] = {}
+        for key, value in environ.items():
+            if not key.startswith(ENV_PREFIX):
+                continue
+            *sections, name = key[len(ENV_PREFIX):].lower().split(ENV_NESTED_DELIMITER)
+            target = values
+            for section in sections:
+                target = target.setdefault(section, {})
+                if not isinstance(target, dict):
+                    break
+            else:
+                # Never let a scalar clobber a section collected from other keys
+                if not isinstance(target.get(name), dict):
+                    target[name] = value
+        return _build(cls, values)
+
 
+# Programmatic overrides applied on top of the environment by update_settings()
+_overrides: Dict[str, Any] = {}
 
-# Global settings instance
-_settings = None
 
+@functools.lru_cache(maxsize=None)
+def _env_settings() -> Settings:
+    """Parse the environment exactly once per process."""
+    return Settings._from_env()
 
+
+@functools.lru_cache(maxsize=None)
 def get_settings() -> Settings:
     """Get the global settings instance.
-    
+
     Returns:
         Settings: The global settings instance
     """
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    if not _overrides:
+        return _env_settings()
+    return replace(_env_settings(), **_overrides)
 
 
 def update_settings(**kwargs) -> None:
     """Update the global settings with new values.
-    
+
+    Values are applied as-is on top of the already-parsed environment,
+    without coercion. Only pass trusted, correctly typed programmatic
+    values here -- never raw environment strings.
+
     Args:
         **kwargs: Settings to update
+
+    Raises:
+        TypeError: If a name is not a ``Settings`` field; the current
+            settings are left unchanged.
     """
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    _settings = _settings.copy(update=kwargs)
+    # Build first, so a bad name never reaches the shared overrides
+    replace(_env_settings(), **{**_overrides, **kwargs})
+    _overrides.update(kwargs)
+    get_settings.cache_clear()
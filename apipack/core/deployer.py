@@ -4,19 +4,231 @@ Package Deployer for APIpack.
 This module provides the PackageDeployer class which is responsible for
 deploying generated API packages to various targets (local, Docker, cloud, etc.).
 """
+import functools
+import json
 import logging
+import os
+import queue
 import shutil
 import subprocess
-import tarfile
-import tempfile
+import sys
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union, Any
 
-import docker
-from docker.errors import DockerException
+from ..utils.file_utils import _walk_tree, _write_bytes
+
+if TYPE_CHECKING:
+    import docker
 
 logger = logging.getLogger(__name__)
 
+# Python's own descriptors are non-inheritable (PEP 446), so on Linux there is
+# nothing to close in the child; skipping the close lets subprocess use the
+# cheaper posix_spawn/vfork path.
+_CLOSE_FDS = not sys.platform.startswith('linux')
+
+# Number of trailing Docker build log chunks kept in deployment results
+_BUILD_LOG_TAIL = 200
+
+# Copy buffer used when streaming file contents into archives; far fewer
+# read/write syscalls per file than tarfile's 16 KiB default.
+_ARCHIVE_COPY_BUFSIZE = 1024 * 1024
+
+
+# Already-compressed formats gain nothing from DEFLATE; store them as-is.
+_COMPRESSED_SUFFIXES = frozenset({
+    '.7z', '.bz2', '.gif', '.gz', '.ico', '.jpeg', '.jpg', '.png', '.tgz',
+    '.webp', '.whl', '.woff', '.woff2', '.xz', '.zip',
+})
+
+
+def _read_entry(entry: os.DirEntry) -> Optional[bytes]:
+    """Read a file entry's contents, or return None for directories."""
+    if entry.is_dir():
+        return None
+    with open(entry.path, 'rb') as f:
+        return f.read()
+
+
+def _zip_compression(name: str) -> int:
+    """Pick the zip compression method for a file name."""
+    import zipfile
+    if os.path.splitext(name)[1].lower() in _COMPRESSED_SUFFIXES:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _drain_build_logs(
+    build_logs: Iterable[Dict[str, Any]],
+    log_file: Optional[Union[str, Path]] = None
+) -> List[Dict[str, Any]]:
+    """Consume a Docker build log stream, keeping only its tail in memory.
+
+    Args:
+        build_logs: Log chunks as yielded by ``images.build``.
+        log_file: Optional path that receives the complete log as it streams.
+
+    Returns:
+        The last ``_BUILD_LOG_TAIL`` log chunks.
+    """
+    if log_file is None:
+        return list(deque(build_logs, maxlen=_BUILD_LOG_TAIL))
+
+    tail: deque = deque(maxlen=_BUILD_LOG_TAIL)
+    fd = os.open(log_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        for chunk in build_logs:
+            tail.append(chunk)
+            line = chunk.get('stream') or json.dumps(chunk) + '\n'
+            os.write(fd, line.encode('utf-8'))
+    finally:
+        os.close(fd)
+    return list(tail)
+
+
+_DOCKERFILE_TEMPLATE = b"""# Generated by APIpack
+FROM python:{python_version}-slim
+
+WORKDIR /app
+
+# Install system dependencies if needed
+# RUN apt-get update && apt-get install -y --no-install-recommends \
+#     <your-packages-here> && \
+#     rm -rf /var/lib/apt/lists/*
+
+# Copy requirements first to leverage Docker cache
+COPY requirements*.txt ./
+RUN pip install --no-cache-dir -r requirements.txt
+
+# Copy the rest of the application
+COPY . .
+
+# Install the package in development mode
+RUN pip install -e .
+
+# Expose the API port
+EXPOSE 8000
+
+# Command to run the application
+CMD ["python", "-m", "your_package.main"]
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _dockerfile_bytes(python_version: str) -> bytes:
+    """Render the default Dockerfile for a Python version (cached per version)."""
+    return _DOCKERFILE_TEMPLATE.replace(
+        b"{python_version}", python_version.encode('ascii')
+    )
+
+
+# Maximum number of read-ahead files buffered between reader and compressor
+_ZIP_QUEUE_SIZE = 64
+
+
+def _read_zip_members(
+    root: str,
+    members: "queue.Queue[Any]",
+    stop: threading.Event
+) -> None:
+    """Producer: walk ``root`` and queue ``(entry, rel_path, data)`` tuples.
+
+    Queues ``None`` when done, or the exception that stopped the walk.
+    """
+    try:
+        for entry, rel_path in _walk_tree(root, sort=True, sep='/'):
+            if stop.is_set():
+                break
+            members.put((entry, rel_path, _read_entry(entry)))
+    except BaseException as e:
+        members.put(e)
+    else:
+        members.put(None)
+
+
+def _write_zip_archive(archive_path: Path, root: str, package_name: str) -> None:
+    """Write ``root`` to a zip archive, reading files on a separate thread.
+
+    File reads overlap with compression (zlib releases the GIL), and the
+    bounded queue caps read-ahead at ``_ZIP_QUEUE_SIZE`` files.
+
+    Args:
+        archive_path: Destination archive path.
+        root: Package directory to archive.
+        package_name: Top-level directory name inside the archive.
+    """
+    import zipfile
+
+    members: "queue.Queue[Any]" = queue.Queue(maxsize=_ZIP_QUEUE_SIZE)
+    stop = threading.Event()
+    reader = threading.Thread(
+        target=_read_zip_members, args=(root, members, stop), daemon=True
+    )
+    reader.start()
+    try:
+        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            while (item := members.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                entry, rel_path, data = item
+                arcname = f"{package_name}/{rel_path}"
+                if data is None:
+                    zipf.write(entry.path, arcname)
+                    continue
+                info = zipfile.ZipInfo.from_file(entry.path, arcname)
+                info.compress_type = _zip_compression(entry.name)
+                zipf.writestr(info, data)
+    finally:
+        # Unblock the reader if we bailed out early, then wait for it.
+        stop.set()
+        while reader.is_alive():
+            try:
+                members.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        reader.join()
+
+
+@functools.lru_cache(maxsize=None)
+def _lazy_import_docker():
+    """Import the Docker SDK on first use; it is heavy and rarely needed."""
+    import docker
+    import docker.errors
+    return docker
+
+
+# Process-wide Docker client, set once a connection succeeds
+_docker_client: Optional["docker.DockerClient"] = None
+_docker_client_lock = threading.Lock()
+
+
+def _get_docker_client() -> Optional["docker.DockerClient"]:
+    """Connect to the Docker daemon, reusing the first working connection.
+
+    Failures are not remembered, so a daemon started later is picked up.
+    The client is shared; never store credentials on it.
+
+    Returns:
+        A pinged Docker client, or None if Docker is not available.
+    """
+    global _docker_client
+    with _docker_client_lock:
+        if _docker_client is not None:
+            return _docker_client
+        docker = _lazy_import_docker()
+        try:
+            client = docker.from_env()
+            client.ping()  # Test the connection
+        except docker.errors.DockerException as e:
+            logger.warning("Docker not available: %s", str(e))
+            return None
+        logger.debug("Docker client initialized successfully")
+        _docker_client = client
+        return client
+
+
 class PackageDeployer:
     """Handles deployment of generated API packages to various targets."""
     
@@ -32,13 +244,7 @@ class PackageDeployer:
     
     def _setup_docker(self) -> None:
         """Set up Docker client if available."""
-        try:
-            self.docker_client = docker.from_env()
-            self.docker_client.ping()  # Test the connection
-            logger.debug("Docker client initialized successfully")
-        except DockerException as e:
-            logger.warning("Docker not available: %s", str(e))
-            self.docker_client = None
+        self.docker_client = _get_docker_client()
     
     def deploy(
         self,
@@ -78,7 +284,8 @@ class PackageDeployer:
         Args:
             package_path: Path to the package directory.
             install: Whether to install the package in development mode.
-            **kwargs: Additional deployment options.
+            **kwargs: Additional deployment options. ``pip_cache_dir`` points
+                pip at a warm cache directory for repeated installs.
             
         Returns:
             Dictionary with deployment results.
@@ -94,12 +301,15 @@ class PackageDeployer:
         try:
             if install:
                 # Run pip install in development mode
-                cmd = [sys.executable, '-m', 'pip', 'install', '-e', str(package_path)]
+                cmd = (sys.executable, '-m', 'pip', 'install', '-e', str(package_path))
+                if kwargs.get('pip_cache_dir'):
+                    cmd += ('--cache-dir', str(kwargs['pip_cache_dir']))
                 result = subprocess.run(
                     cmd,
                     capture_output=True,
                     text=True,
-                    check=True
+                    check=True,
+                    close_fds=_CLOSE_FDS
                 )
                 results['installed'] = True
                 results['details']['install_output'] = result.stdout
@@ -145,7 +355,8 @@ class PackageDeployer:
             package_path: Path to the package directory.
             tag: Docker image tag.
             build_args: Additional build arguments for Docker.
-            **kwargs: Additional deployment options.
+            **kwargs: Additional deployment options. ``log_file`` receives the
+                full build log; only its tail is kept in the results.
             
         Returns:
             Dictionary with deployment results.
@@ -168,6 +379,7 @@ class PackageDeployer:
             })
             return results
             
+        DockerException = _lazy_import_docker().errors.DockerException
         try:
             # Check if we have a Dockerfile or need to generate one
             dockerfile = package_path / 'Dockerfile'
@@ -187,7 +399,9 @@ class PackageDeployer:
             image, build_logs = build_result
             results['built'] = True
             results['details']['image_id'] = image.id
-            results['details']['build_logs'] = list(build_logs)
+            results['details']['build_logs'] = _drain_build_logs(
+                build_logs, kwargs.get('log_file')
+            )
             
             # Run the container if requested
             if kwargs.get('run_container', True):
@@ -208,17 +422,12 @@ class PackageDeployer:
                 password = kwargs.get('password')
                 
                 if username and password:
-                    self.docker_client.login(
-                        username=username,
-                        password=password,
-                        registry=registry
-                    )
-                    
                     # Tag for registry
                     registry_tag = f"{registry}/{tag}" if registry != 'docker.io' else tag
                     image.tag(registry_tag)
                     
-                    # Push the image
+                    # Push the image; credentials go with this request only,
+                    # as the client is shared with other deployers
                     push_logs = self.docker_client.images.push(
                         repository=registry_tag,
                         auth_config={"username": username, "password": password}
@@ -262,34 +471,10 @@ class PackageDeployer:
         dockerfile_path = package_path / 'Dockerfile'
         python_version = kwargs.get('python_version', '3.9')
         
-        dockerfile_content = f"""# Generated by APIpack
-FROM python:{python_version}-slim
-
-WORKDIR /app
-
-# Install system dependencies if needed
-# RUN apt-get update && apt-get install -y --no-install-recommends \
-#     <your-packages-here> && \
-#     rm -rf /var/lib/apt/lists/*
-
-# Copy requirements first to leverage Docker cache
-COPY requirements*.txt ./
-RUN pip install --no-cache-dir -r requirements.txt
-
-# Copy the rest of the application
-COPY . .
-
-# Install the package in development mode
-RUN pip install -e .
-
-# Expose the API port
-EXPOSE 8000
-
-# Command to run the application
-CMD ["python", "-m", "your_package.main"]
-"""
-        with open(dockerfile_path, 'w') as f:
-            f.write(dockerfile_content)
+        # str() first: YAML may give a float like 3.11, and the cache
+        # needs a hashable key
+        data = _dockerfile_bytes(str(python_version))
+        _write_bytes(dockerfile_path, data)
         logger.info("Generated Dockerfile at %s", dockerfile_path)
     
     def deploy_to_kubernetes(
@@ -365,6 +550,7 @@ CMD ["python", "-m", "your_package.main"]
             Path to the created archive.
         """
         if output_dir is None:
+            import tempfile
             output_dir = Path(tempfile.mkdtemp())
             
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -372,14 +558,28 @@ CMD ["python", "-m", "your_package.main"]
         archive_path = output_dir / f"{package_name}.{format}"
         
         if format == 'tar.gz':
-            with tarfile.open(archive_path, 'w:gz') as tar:
-                tar.add(package_path, arcname=package_name)
+            import tarfile
+            root = str(package_path)
+            # Enumerate the whole tree first, then stream each file through
+            # a large copy buffer instead of letting tar.add() recurse.
+            entries = list(_walk_tree(root, sort=True, sep='/'))
+            with tarfile.open(
+                archive_path, 'w:gz', copybufsize=_ARCHIVE_COPY_BUFSIZE
+            ) as tar:
+                tar.add(root, arcname=package_name, recursive=False)
+                for entry, rel_path in entries:
+                    arcname = f"{package_name}/{rel_path}"
+                    tarinfo = tar.gettarinfo(entry.path, arcname)
+                    if tarinfo is None:
+                        # Sockets and other unsupported file types
+                        continue
+                    if tarinfo.isreg():
+                        with open(entry.path, 'rb') as f:
+                            tar.addfile(tarinfo, f)
+                    else:
+                        tar.addfile(tarinfo)
         elif format == 'zip':
-            import zipfile
-            with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for file in package_path.rglob('*'):
-                    arcname = file.relative_to(package_path.parent)
-                    zipf.write(file, arcname)
+            _write_zip_archive(archive_path, str(package_path), package_name)
         else:
             raise ValueError(f"Unsupported archive format: {format}")
             
@@ -4,15 +4,137 @@ Code Generator for APIpack.
 This module provides the CodeGenerator class which is responsible for generating
 code based on templates and function specifications.
 """
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Pattern, Tuple
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import os
+import re
 import shutil
 import logging
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+
+from ..utils.file_utils import _copy_file_data, _walk_tree, _write_bytes
+
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
+
+    from .spec import Spec
 
 logger = logging.getLogger(__name__)
 
+# Per-file rendering and copying is I/O heavy, so oversubscribe the CPUs.
+_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _make_env(template_dirs: Tuple[str, ...]) -> "Environment":
+    """Return the shared Jinja2 environment for the existing template dirs.
+
+    Only directories that exist right now form the cache key, so a
+    directory created later gets a fresh environment instead of the
+    current-directory fallback used while it was missing.
+
+    Args:
+        template_dirs: Resolved template directories, in lookup order.
+
+    Returns:
+        A shared Environment with a filesystem bytecode cache enabled.
+    """
+    search_path = tuple(d for d in template_dirs if os.path.exists(d))
+
+    if not search_path:
+        logger.warning(
+            "No template directories found in: %s. Using current directory.",
+            ", ".join(template_dirs)
+        )
+        search_path = (".",)
+
+    return _shared_env(search_path)
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_env(search_path: Tuple[str, ...]) -> "Environment":
+    """Build (once per search path) a Jinja2 environment."""
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    # Compiled templates are memoized per CodeGenerator, so Jinja's own
+    # template cache is disabled; the bytecode cache amortizes compilation
+    # across generators and runs.
+    return Environment(
+        loader=FileSystemLoader(list(search_path)),
+        autoescape=True,
+        keep_trailing_newline=True,
+        cache_size=0,
+        bytecode_cache=FileSystemBytecodeCache(),
+    )
+
+
+def _resolve_dirs(template_dirs: List[str]) -> Tuple[str, ...]:
+    """Normalize template directories into a hashable cache key."""
+    return tuple(str(Path(d).resolve()) for d in template_dirs)
+
+
+def _glob_component(part: str) -> str:
+    """Translate one glob path component into a regex that never spans ``/``."""
+    out = []
+    i, n = 0, len(part)
+    while i < n:
+        c = part[i]
+        i += 1
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1 if part[i:i + 1] == "!" else i
+            j = part.find("]", j + 1 if part[j:j + 1] == "]" else j)
+            if j < 0:
+                out.append(re.escape(c))
+                continue
+            chars = part[i:j].replace("\\", "\\\\")
+            i = j + 1
+            if chars.startswith("!"):
+                # Negated sets would otherwise match the separator
+                out.append(f"(?!/)[^{chars[1:]}]")
+            elif chars.startswith("^"):
+                out.append(f"[\\{chars}]")
+            else:
+                out.append(f"[{chars}]")
+        else:
+            out.append(re.escape(c))
+    return "".join(out)
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_excludes(patterns: Tuple[str, ...]) -> Optional[Pattern[str]]:
+    """Fold glob patterns into one regex matched against relative paths.
+
+    Like ``PurePath.match``, a pattern may match any trailing part of the
+    path, so ``*.pyc`` and ``__pycache__`` exclude entries at any depth,
+    while wildcards stay within one component: ``a/*.py`` matches
+    ``a/b.py`` but not ``a/b/c.py``.
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(
+        "(?:(?:.*/)?{}\\Z)".format("/".join(map(_glob_component, p.split("/"))))
+        for p in patterns
+    ), re.DOTALL)
+
+
+def _fast_copy(src: str, dst: str) -> str:
+    """Copy ``src`` to ``dst`` with its metadata, like ``shutil.copy2``.
+
+    Returns:
+        str: The destination path.
+
+    Raises:
+        shutil.SameFileError: If ``dst`` is ``src`` or a link to it.
+    """
+    _copy_file_data(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
+
 class CodeGenerator:
     """Generates code based on templates and function specifications."""
     
@@ -24,31 +146,21 @@ class CodeGenerator:
         """
         self.template_dirs = template_dirs or ["templates"]
         self.env = self._setup_environment()
+        # Compiled templates keyed by (environment, name); entries are
+        # reloaded once their source changes on disk
+        self._tmpl_cache: Dict[Tuple["Environment", str], "Template"] = {}
     
-    def _setup_environment(self):
+    def _setup_environment(self) -> "Environment":
         """Set up the Jinja2 environment with template loaders."""
-        # Convert string paths to Path objects and ensure they exist
-        template_paths = [Path(d) for d in self.template_dirs if Path(d).exists()]
-        
-        if not template_paths:
-            logger.warning(
-                "No template directories found in: %s. Using current directory.",
-                ", ".join(self.template_dirs)
-            )
-            template_paths = [Path(".")]
-            
-        return Environment(
-            loader=FileSystemLoader([str(p) for p in template_paths]),
-            autoescape=True,
-            keep_trailing_newline=True,
-        )
+        return _make_env(_resolve_dirs(self.template_dirs))
     
     def generate_file(
         self,
         template_path: str,
         output_path: str,
         context: Dict[str, Any],
-        overwrite: bool = False
+        overwrite: bool = False,
+        env: Optional["Environment"] = None
     ) -> bool:
         """Generate a single file from a template.
         
@@ -57,10 +169,13 @@ class CodeGenerator:
             output_path: Path where the generated file should be saved.
             context: Dictionary of variables to pass to the template.
             overwrite: Whether to overwrite existing files.
+            env: Environment to render with. Defaults to ``self.env``.
             
         Returns:
             bool: True if file was generated, False otherwise.
         """
+        from jinja2 import TemplateNotFound
+
         output_path = Path(output_path)
         
         # Create parent directories if they don't exist
@@ -72,11 +187,13 @@ class CodeGenerator:
             return False
             
         try:
-            template = self.env.get_template(template_path)
+            key = (env or self.env, template_path)
+            template = self._tmpl_cache.get(key)
+            if template is None or not template.is_up_to_date:
+                template = self._tmpl_cache[key] = key[0].get_template(template_path)
             rendered = template.render(**context)
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(rendered)
+            _write_bytes(output_path, rendered.encode('utf-8'))
                 
             logger.debug("Generated file: %s", output_path)
             return True
@@ -94,8 +211,9 @@ class CodeGenerator:
         dest_dir: str,
         context: Dict[str, Any],
         exclude: Optional[List[str]] = None,
-        overwrite: bool = False
-    ) -> int:
+        overwrite: bool = False,
+        env: Optional["Environment"] = None
+    ) -> List[str]:
         """Generate a directory of files from templates.
         
         Args:
@@ -104,53 +222,112 @@ class CodeGenerator:
             context: Dictionary of variables to pass to templates.
             exclude: List of file patterns to exclude.
             overwrite: Whether to overwrite existing files.
+            env: Environment to render with. Defaults to ``self.env``.
             
         Returns:
-            int: Number of files generated.
+            List[str]: Paths of the files generated, in walk order.
         """
         src_path = Path(src_dir)
         dest_path = Path(dest_dir)
-        exclude = exclude or []
-        generated = 0
+        exclude_re = _compile_excludes(tuple(exclude or ()))
+        generated: List[str] = []
         
         if not src_path.exists():
             logger.error("Source directory not found: %s", src_dir)
-            return 0
+            return generated
             
         # Create destination directory if it doesn't exist
         dest_path.mkdir(parents=True, exist_ok=True)
+        dest_root = str(dest_path)
         
-        for item in src_path.rglob('*'):
-            # Skip excluded files/directories
-            if any(item.match(pattern) for pattern in exclude):
-                continue
-                
-            rel_path = item.relative_to(src_path)
-            dest_item = dest_path / rel_path
+        # Walk the tree serially (creating directories as we go), then fan
+        # the independent per-file render/copy work out to a thread pool.
+        outputs = []
+        tasks = []
+        # Relative paths use "/" so exclude patterns match on every platform;
+        # excluded directories are not descended into.
+        prune = None if exclude_re is None else (
+            lambda entry, rel_path: exclude_re.match(rel_path)
+        )
+        for entry, rel_path in _walk_tree(str(src_path), prune, sep="/"):
+            dest_item = os.path.join(dest_root, rel_path)
+            is_dir = entry.is_dir()
             
-            if item.is_file():
+            if is_dir:
+                # Create subdirectories
+                os.makedirs(dest_item, exist_ok=True)
+            
+            elif entry.is_file():
                 # For template files, render with context
-                if item.suffix in ['.j2', '.jinja2']:
-                    output_path = dest_item.with_suffix('')
-                    if self.generate_file(
-                        str(rel_path),
-                        str(output_path),
+                if entry.name.endswith(('.j2', '.jinja2')):
+                    output_path = os.path.splitext(dest_item)[0]
+                    outputs.append(output_path)
+                    tasks.append(functools.partial(
+                        self.generate_file,
+                        rel_path,
+                        output_path,
                         context,
-                        overwrite
-                    ):
-                        generated += 1
+                        overwrite,
+                        env
+                    ))
                 else:
                     # For non-template files, just copy
-                    if not dest_item.exists() or overwrite:
-                        shutil.copy2(item, dest_item)
-                        generated += 1
+                    if overwrite or not os.path.exists(dest_item):
+                        outputs.append(dest_item)
+                        tasks.append(functools.partial(
+                            _fast_copy, entry.path, dest_item
+                        ))
+        
+        if not tasks:
+            return generated
             
-            elif item.is_dir() and not dest_item.exists():
-                # Create subdirectories
-                dest_item.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(tasks))) as pool:
+            futures = [pool.submit(task) for task in tasks]
+            for output_path, future in zip(outputs, futures):
+                if future.result():
+                    generated.append(output_path)
         
         return generated
     
+    def _spec_environment(self, template_dir: Optional[str]) -> "Environment":
+        """Return the environment for a spec run without mutating ``self``."""
+        if template_dir:
+            return _make_env(_resolve_dirs([template_dir, *self.template_dirs]))
+        return self.env
+    
+    def _generate_spec_file(
+        self,
+        env: "Environment",
+        output_path: Path,
+        template: str,
+        output: str,
+        context: Dict[str, Any],
+        overwrite: bool,
+        results: Dict[str, Any]
+    ) -> None:
+        """Render one spec file entry and record the outcome in ``results``."""
+        output_file = output_path / output
+        if self.generate_file(template, str(output_file), context, overwrite, env):
+            results['generated_files'].append(str(output_file))
+        else:
+            results['skipped_files'].append(str(output_file))
+    
+    def _generate_spec_directory(
+        self,
+        env: "Environment",
+        output_path: Path,
+        source: str,
+        destination: str,
+        context: Dict[str, Any],
+        exclude: List[str],
+        overwrite: bool,
+        results: Dict[str, Any]
+    ) -> None:
+        """Render one spec directory entry and record the outcome in ``results``."""
+        results['generated_files'].extend(self.generate_directory(
+            source, str(output_path / destination), context, exclude, overwrite, env
+        ))
+    
     def generate_from_spec(
         self,
         spec: Dict[str, Any],
@@ -177,10 +354,8 @@ class CodeGenerator:
         }
         
         try:
-            # Set up template directory
-            if template_dir:
-                self.template_dirs.insert(0, template_dir)
-                self.env = self._setup_environment()
+            # Set up template directory without rebuilding the shared environment
+            env = self._spec_environment(template_dir)
             
             output_path = Path(output_dir)
             output_path.mkdir(parents=True, exist_ok=True)
@@ -188,16 +363,11 @@ class CodeGenerator:
             # Process each file in the spec
             for file_spec in spec.get('files', []):
                 try:
-                    template = file_spec['template']
-                    output = file_spec['output']
                     file_context = {**spec.get('context', {}), **file_spec.get('context', {})}
-                    
-                    # Generate the file
-                    output_file = output_path / output
-                    if self.generate_file(template, str(output_file), file_context, overwrite):
-                        results['generated_files'].append(str(output_file))
-                    else:
-                        results['skipped_files'].append(str(output_file))
+                    self._generate_spec_file(
+                        env, output_path, file_spec['template'], file_spec['output'],
+                        file_context, overwrite, results
+                    )
                         
                 except Exception as e:
                     error_msg = f"Error processing {file_spec.get('template', 'unknown')}: {str(e)}"
@@ -207,18 +377,11 @@ class CodeGenerator:
             # Process each directory in the spec
             for dir_spec in spec.get('directories', []):
                 try:
-                    src = dir_spec['source']
-                    dest = dir_spec.get('destination', '')
                     dir_context = {**spec.get('context', {}), **dir_spec.get('context', {})}
-                    exclude = dir_spec.get('exclude', [])
-                    
-                    # Generate the directory
-                    dest_path = output_path / dest
-                    count = self.generate_directory(
-                        src, str(dest_path), dir_context, exclude, overwrite
-                    )
-                    results['generated_files'].extend(
-                        str(dest_path / f) for f in os.listdir(dest_path)
+                    self._generate_spec_directory(
+                        env, output_path, dir_spec['source'],
+                        dir_spec.get('destination', ''), dir_context,
+                        dir_spec.get('exclude', []), overwrite, results
                     )
                     
                 except Exception as e:
@@ -237,3 +400,72 @@ class CodeGenerator:
             results['errors'].append(error_msg)
         
         return results
+    
+    def generate_from_spec_struct(
+        self,
+        spec: "Spec",
+        output_dir: str,
+        template_dir: Optional[str] = None,
+        overwrite: bool = False
+    ) -> Dict[str, Any]:
+        """Generate code from a typed :class:`~apipack.core.spec.Spec`.
+        
+        Equivalent to :meth:`generate_from_spec`, but the spec has already
+        been decoded and validated by msgspec, so entries are read by
+        attribute instead of by dict lookups with defaults.
+        
+        Args:
+            spec: Decoded generation specification.
+            output_dir: Base directory for generated files.
+            template_dir: Optional directory containing templates.
+            overwrite: Whether to overwrite existing files.
+            
+        Returns:
+            Dict with generation results and metadata.
+        """
+        results = {
+            'success': True,
+            'generated_files': [],
+            'skipped_files': [],
+            'errors': []
+        }
+        
+        try:
+            env = self._spec_environment(template_dir)
+            
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
+            
+            for file_spec in spec.files:
+                try:
+                    self._generate_spec_file(
+                        env, output_path, file_spec.template, file_spec.output,
+                        {**spec.context, **file_spec.context}, overwrite, results
+                    )
+                except Exception as e:
+                    error_msg = f"Error processing {file_spec.template}: {str(e)}"
+                    logger.error(error_msg)
+                    results['errors'].append(error_msg)
+            
+            for dir_spec in spec.directories:
+                try:
+                    self._generate_spec_directory(
+                        env, output_path, dir_spec.source, dir_spec.destination,
+                        {**spec.context, **dir_spec.context}, dir_spec.exclude,
+                        overwrite, results
+                    )
+                except Exception as e:
+                    error_msg = f"Error processing directory {dir_spec.source}: {str(e)}"
+                    logger.error(error_msg)
+                    results['errors'].append(error_msg)
+            
+            if results['errors']:
+                results['success'] = False
+                
+        except Exception as e:
+            error_msg = f"Generation failed: {str(e)}"
+            logger.exception(error_msg)
+            results['success'] = False
+            results['errors'].append(error_msg)
+        
+        return results
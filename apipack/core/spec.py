@@ -0,0 +1,49 @@
+"""
+Typed generation specifications for APIpack.
+
+This module provides msgspec ``Struct`` equivalents of the spec dictionaries
+accepted by :meth:`CodeGenerator.generate_from_spec`. Decoding straight into
+these structs validates the input in a single pass and gives the generator
+plain attribute access. It requires the optional ``msgspec`` dependency
+(``pip install apipack[fast]``).
+"""
+from typing import Any, Dict, List, Union
+
+import msgspec
+
+
+class FileSpec(msgspec.Struct):
+    """A single template to render into an output file."""
+    template: str
+    output: str
+    context: Dict[str, Any] = {}
+
+
+class DirSpec(msgspec.Struct):
+    """A directory of templates and assets to render into a destination."""
+    source: str
+    destination: str = ""
+    context: Dict[str, Any] = {}
+    exclude: List[str] = []
+
+
+class Spec(msgspec.Struct):
+    """A complete generation specification."""
+    files: List[FileSpec] = []
+    directories: List[DirSpec] = []
+    context: Dict[str, Any] = {}
+
+
+def decode_spec(data: Union[bytes, str]) -> Spec:
+    """Decode and validate a JSON generation specification.
+
+    Args:
+        data: JSON document describing the files and directories to generate.
+
+    Returns:
+        Spec: The decoded specification.
+
+    Raises:
+        msgspec.ValidationError: If the document does not match the schema.
+    """
+    return msgspec.json.decode(data, type=Spec)
@@ -5,14 +5,149 @@ This module provides the CodeValidator class which is responsible for validating
 generated code against various quality and style standards.
 """
 import ast
+import fnmatch
+import hashlib
+import json
 import logging
-import subprocess
+import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Union, Any
+
+from ..utils.file_utils import _walk_tree
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever validator output changes so stale cache entries are ignored
+_CACHE_VERSION = "1"
+
+# Below this many files, process start-up costs more than it saves
+_PARALLEL_MIN_FILES = 16
+
+# Directories never worth descending into when collecting files
+_DEFAULT_EXCLUDE_DIRS = frozenset({'.git', '__pycache__', '.venv', 'node_modules'})
+
+# The ":line[:col]: CODE" following the path in "path:line[:col]: CODE message"
+# lines, as printed by flake8 and similar linters
+_LINT_LINE_RE = re.compile(r':\d+:(?:\d+:)?\s*(?P<code>\S*)')
+
+# Make pylint print one flake8-style line per message so output can be
+# parsed as it streams; the code's first letter is the message category
+_PYLINT_ARGS = (
+    '--msg-template={path}:{line}:{column}: {msg_id} {msg} ({symbol})',
+    '--score=n',
+)
+
+
+# CodeValidator._flags bits for the optional AST checks
+_CHECK_TYPE_HINTS = 1
+_CHECK_DOCSTRINGS = 2
+
+# Definition node types checked for type hints and docstrings
+_FUNC_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_DEF_NODES = _FUNC_NODES + (ast.ClassDef,)
+
+# Statement-list fields; definitions can only appear inside these
+_STATEMENT_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+
+
+class _DefinitionCollector(ast.NodeVisitor):
+    """Collect function and class definitions in source order.
+    
+    Only statement lists are traversed, so expressions (the bulk of any
+    tree) are never visited.
+    """
+    
+    def __init__(self) -> None:
+        self.definitions: List[ast.AST] = []
+    
+    def visit(self, node: ast.AST) -> None:
+        # One isinstance test instead of NodeVisitor's per-node method lookup
+        if isinstance(node, _DEF_NODES):
+            self.definitions.append(node)
+        self.generic_visit(node)
+    
+    def generic_visit(self, node: ast.AST) -> None:
+        for field in _STATEMENT_FIELDS:
+            for child in getattr(node, field, None) or ():
+                self.visit(child)
+
+
+def _scan_files(root: str, file_pattern: str, exclude_dirs: frozenset) -> Iterator[str]:
+    """Yield paths of files under ``root`` whose name matches ``file_pattern``.
+    
+    Symlinks are not followed and directories named in ``exclude_dirs`` are
+    skipped entirely.
+    """
+    if file_pattern == '*.py':
+        def matches(name: str) -> bool:
+            return name.endswith('.py')
+    else:
+        matches = re.compile(fnmatch.translate(file_pattern)).match
+        
+    def excluded(entry: os.DirEntry, rel_path: str) -> bool:
+        return entry.name in exclude_dirs and entry.is_dir(follow_symlinks=False)
+    
+    for entry, _ in _walk_tree(root, excluded, sort=True):
+        if matches(entry.name) and entry.is_file(follow_symlinks=False):
+            yield entry.path
+
+
+def _attribute_lint_line(line: str, by_abspath: Dict[str, str]) -> Optional[Tuple[str, str]]:
+    """Find the linted file a ``path:line:[column:] code ...`` line is about.
+    
+    Paths may themselves contain ``:``, so every ``:line:`` position is
+    tried until the text before it names one of the linted files.
+    
+    Returns:
+        The file's key in ``by_abspath`` and the message code, or None.
+    """
+    pos = line.find(':')
+    while pos > 0:
+        match = _LINT_LINE_RE.match(line, pos)
+        if match:
+            path = by_abspath.get(os.path.abspath(line[:pos]))
+            if path:
+                return path, match.group('code')
+        pos = line.find(':', pos + 1)
+    return None
+
+
+def _has_docstring(node: ast.AST) -> bool:
+    """Whether a module, class or function body starts with a string literal.
+    
+    Equivalent to ``ast.get_docstring(node) is not None`` without cleaning
+    the docstring text.
+    """
+    first = node.body[0] if node.body else None
+    return (
+        isinstance(first, ast.Expr)
+        and isinstance(first.value, ast.Constant)
+        and isinstance(first.value.value, str)
+    )
+
+
+@dataclass
+class ParsedFile:
+    """A source file parsed once and shared by every validator."""
+    content: bytes
+    tree: Optional[ast.Module]
+    syntax_error: Optional[SyntaxError] = None
+    
+    @cached_property
+    def definitions(self) -> List[ast.AST]:
+        """Function and class definitions, collected on first use."""
+        collector = _DefinitionCollector()
+        # Cheap substring test first; most data/constant modules define nothing
+        if self.tree is not None and (b'def ' in self.content or b'class ' in self.content):
+            collector.visit(self.tree)
+        return collector.definitions
+
+
 class CodeValidator:
     """Validates generated code for syntax, style, and quality."""
     
@@ -20,9 +155,14 @@ class CodeValidator:
         """Initialize the code validator.
         
         Args:
-            config: Configuration dictionary for the validator.
+            config: Configuration dictionary for the validator. Set
+                ``cache_dir`` to reuse results for unchanged files across
+                runs; ``cache_max_entries`` bounds its size (default 10000).
         """
         self.config = config or {}
+        cache_dir = self.config.get('cache_dir')
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._cache_max_entries = self.config.get('cache_max_entries', 10000)
         self._setup_validators()
     
     def _setup_validators(self) -> None:
@@ -37,6 +177,83 @@ class CodeValidator:
         for validator in list(self.validators.keys()):
             if self.config.get(f'disable_{validator}', False):
                 del self.validators[validator]
+        
+        # Resolve config once rather than on every validated file
+        self._flags = 0
+        if self.config.get('check_type_hints', True):
+            self._flags |= _CHECK_TYPE_HINTS
+        if self.config.get('check_docstrings', True):
+            self._flags |= _CHECK_DOCSTRINGS
+        self._active = tuple(self.validators.items())
+        
+        # With both AST checks active, run them as one pass over the tree
+        self._fuse_ast_checks = (
+            'type_hints' in self.validators
+            and 'docstrings' in self.validators
+            and self._flags == _CHECK_TYPE_HINTS | _CHECK_DOCSTRINGS
+        )
+        
+        # Anything that changes validator output must be part of cache keys
+        self._cache_salt = json.dumps([
+            _CACHE_VERSION,
+            sorted(self.validators),
+            self._flags,
+        ]).encode('utf-8')
+    
+    def _cache_path(self, file_path: str, content: bytes) -> Path:
+        """Locate the cache entry for a file's path, content and config."""
+        h = hashlib.blake2b(self._cache_salt, digest_size=16)
+        h.update(file_path.encode('utf-8') + b'\0')
+        h.update(content)
+        key = h.hexdigest()
+        return self._cache_dir / key[:2] / key
+    
+    @staticmethod
+    def _load_cached(path: Path) -> Optional[Dict[str, List[str]]]:
+        """Return cached results, or None on a miss or unreadable entry."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+            os.utime(path)  # Mark as recently used for eviction
+            return results
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug("Ignoring unreadable cache entry %s: %s", path, e)
+            return None
+    
+    @staticmethod
+    def _store_cached(path: Path, results: Dict[str, List[str]]) -> None:
+        """Atomically write results to the cache; failures are not fatal."""
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug("Could not write cache entry %s: %s", path, e)
+    
+    def _evict_cache(self) -> None:
+        """Trim the cache to ``cache_max_entries``, least recently used first."""
+        if self._cache_dir is None or not self._cache_dir.is_dir():
+            return
+        entries = []
+        with os.scandir(self._cache_dir) as buckets:
+            for bucket in buckets:
+                if bucket.is_dir():
+                    with os.scandir(bucket.path) as it:
+                        for entry in it:
+                            entries.append((entry.stat().st_atime, entry.path))
+        excess = len(entries) - self._cache_max_entries
+        if excess <= 0:
+            return
+        entries.sort()
+        for _, path in entries[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
     
     def validate_file(self, file_path: Union[str, Path]) -> Dict[str, List[str]]:
         """Validate a single file.
@@ -53,21 +270,44 @@ class CodeValidator:
         
         results = {}
         
-        # Read the file content once and pass it to validators
+        # Read and parse the file once and pass the result to validators.
+        # ast.parse detects the source encoding itself, so skip decoding.
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open(file_path, 'rb') as f:
                 content = f.read()
                 
+            cache_path = None
+            if self._cache_dir is not None:
+                cache_path = self._cache_path(str(file_path), content)
+                cached = self._load_cached(cache_path)
+                if cached is not None:
+                    return cached
+                
+            try:
+                parsed = ParsedFile(content, ast.parse(content, filename=str(file_path)))
+            except SyntaxError as e:
+                parsed = ParsedFile(content, None, e)
+                
+            fused = {}
+            if self._fuse_ast_checks and parsed.tree is not None:
+                fused = self._validate_ast(parsed, str(file_path))
+                
             # Run each validator
-            for name, validator in self.validators.items():
+            for name, validator in self._active:
+                # AST-based checks are meaningless on a file that doesn't parse
+                if parsed.tree is None and name != 'syntax':
+                    continue
                 try:
-                    errors = validator(content, str(file_path))
+                    errors = fused[name] if name in fused else validator(parsed, str(file_path))
                     if errors:
                         results[name] = errors
                 except Exception as e:
                     logger.error("Validator %s failed: %s", name, str(e))
                     results[name] = [f"Validator error: {str(e)}"]
                     
+            if cache_path is not None:
+                self._store_cached(cache_path, results)
+                    
         except Exception as e:
             logger.error("Error reading file %s: %s", file_path, str(e))
             results['file_error'] = [f"Failed to read file: {str(e)}"]
@@ -87,71 +327,111 @@ class CodeValidator:
             
         Returns:
             Nested dictionary mapping file paths to validation results.
+            When the ``external_linter`` config option names a linter, it is
+            run once over all files and failures are reported under ``linter``.
         """
         dir_path = Path(dir_path)
-        if not dir_path.is_dir():
-            raise NotADirectoryError(f"Directory not found: {dir_path}")
-            
-        results = {}
+        files = self._collect_files(dir_path, file_pattern)
+        results = {
+            rel_path: file_results
+            for rel_path, file_results in self._iter_results(dir_path, files)
+            if file_results
+        }
         
-        for file_path in dir_path.rglob(file_pattern):
-            if file_path.is_file():
-                file_results = self.validate_file(file_path)
-                if file_results:
-                    results[str(file_path.relative_to(dir_path))] = file_results
+        linter = self.config.get('external_linter')
+        if linter and files:
+            lint_results = self.run_external_linter_batch(files, linter)
+            for file_path in files:
+                success, output = lint_results.get(str(file_path), (True, ''))
+                if not success:
+                    rel_path = str(file_path.relative_to(dir_path))
+                    results.setdefault(rel_path, {})['linter'] = [output]
                     
         return results
     
-    def _validate_syntax(self, content: str, file_path: str) -> List[str]:
+    def iter_validate_directory(
+        self,
+        dir_path: Union[str, Path],
+        file_pattern: str = "*.py"
+    ) -> Iterator[Tuple[str, Dict[str, List[str]]]]:
+        """Validate files in a directory, yielding results in file order.
+        
+        Large trees are validated in a process pool unless the ``parallel``
+        config option is false; ``max_workers`` caps the pool size.
+        
+        Args:
+            dir_path: Directory to search for files.
+            file_pattern: File pattern to match (e.g., '*.py').
+            
+        Returns:
+            Iterator of ``(relative_path, results)`` pairs in file order.
+        """
+        dir_path = Path(dir_path)
+        return self._iter_results(dir_path, self._collect_files(dir_path, file_pattern))
+    
+    def _collect_files(self, dir_path: Path, file_pattern: str) -> List[Path]:
+        """List the files under ``dir_path`` that match ``file_pattern``.
+        
+        Directories in the ``exclude_dirs`` config option (by default VCS,
+        cache and virtualenv directories) are not searched.
+        """
+        if not dir_path.is_dir():
+            raise NotADirectoryError(f"Directory not found: {dir_path}")
+        exclude_dirs = frozenset(self.config.get('exclude_dirs', _DEFAULT_EXCLUDE_DIRS))
+        return [Path(p) for p in _scan_files(str(dir_path), file_pattern, exclude_dirs)]
+    
+    def _iter_results(
+        self,
+        dir_path: Path,
+        files: List[Path]
+    ) -> Iterator[Tuple[str, Dict[str, List[str]]]]:
+        """Validate ``files`` serially or in a process pool and yield results."""
+        if self.config.get('parallel', True) and len(files) >= _PARALLEL_MIN_FILES:
+            workers = self.config.get('max_workers') or os.cpu_count() or 1
+            chunksize = max(1, len(files) // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                outcomes = pool.map(self.validate_file, files, chunksize=chunksize)
+                for file_path, file_results in zip(files, outcomes):
+                    yield str(file_path.relative_to(dir_path)), file_results
+        else:
+            for file_path in files:
+                yield str(file_path.relative_to(dir_path)), self.validate_file(file_path)
+        
+        self._evict_cache()
+    
+    def _validate_syntax(self, parsed: ParsedFile, file_path: str) -> List[str]:
         """Validate Python syntax.
         
         Args:
-            content: Source code to validate.
+            parsed: The parsed source file.
             file_path: Path to the file (for error messages).
             
         Returns:
             List of error messages, or empty list if valid.
         """
-        try:
-            ast.parse(content)
+        e = parsed.syntax_error
+        if e is None:
             return []
-        except SyntaxError as e:
-            return [f"Syntax error in {file_path} at line {e.lineno}: {e.msg}"]
+        return [f"Syntax error in {file_path} at line {e.lineno}: {e.msg}"]
     
-    def _validate_type_hints(self, content: str, file_path: str) -> List[str]:
+    def _validate_type_hints(self, parsed: ParsedFile, file_path: str) -> List[str]:
         """Check for missing type hints in function signatures.
         
         Args:
-            content: Source code to validate.
+            parsed: The parsed source file.
             file_path: Path to the file (for error messages).
             
         Returns:
             List of error messages, or empty list if valid.
         """
-        if not self.config.get('check_type_hints', True):
+        if not self._flags & _CHECK_TYPE_HINTS:
             return []
             
         errors = []
         
         try:
-            tree = ast.parse(content)
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    # Check return type annotation
-                    if node.returns is None and not node.name.startswith('_'):
-                        errors.append(
-                            f"Missing return type annotation for function '{node.name}' "
-                            f"in {file_path}:{node.lineno}"
-                        )
-                    
-                    # Check argument type annotations
-                    for arg in node.args.args:
-                        if arg.annotation is None and not arg.arg.startswith('_'):
-                            errors.append(
-                                f"Missing type annotation for parameter '{arg.arg}' "
-                                f"in function '{node.name}' in {file_path}:{node.lineno}"
-                            )
+            for node in parsed.definitions:
+                self._check_type_hints(node, file_path, errors)
                             
         except Exception as e:
             logger.error("Error checking type hints in %s: %s", file_path, str(e))
@@ -159,38 +439,25 @@ class CodeValidator:
             
         return errors
     
-    def _validate_docstrings(self, content: str, file_path: str) -> List[str]:
+    def _validate_docstrings(self, parsed: ParsedFile, file_path: str) -> List[str]:
         """Check for missing or malformed docstrings.
         
         Args:
-            content: Source code to validate.
+            parsed: The parsed source file.
             file_path: Path to the file (for error messages).
             
         Returns:
             List of error messages, or empty list if valid.
         """
-        if not self.config.get('check_docstrings', True):
+        if not self._flags & _CHECK_DOCSTRINGS:
             return []
             
         errors = []
         
         try:
-            tree = ast.parse(content)
-            
-            # Check module docstring
-            if not (tree.body and isinstance(tree.body[0], ast.Expr) and 
-                   isinstance(tree.body[0].value, ast.Str)):
-                errors.append(f"Missing module docstring in {file_path}")
-            
-            # Check function and class docstrings
-            for node in ast.walk(tree):
-                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-                    if not (node.body and isinstance(node.body[0], ast.Expr) and 
-                           isinstance(node.body[0].value, ast.Str)):
-                        node_type = 'function' if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) else 'class'
-                        errors.append(
-                            f"Missing {node_type} docstring for '{node.name}' in {file_path}:{node.lineno}"
-                        )
+            self._check_module_docstring(parsed, file_path, errors)
+            for node in parsed.definitions:
+                self._check_docstring(node, file_path, errors)
                             
         except Exception as e:
             logger.error("Error checking docstrings in %s: %s", file_path, str(e))
@@ -198,6 +465,72 @@ class CodeValidator:
             
         return errors
     
+    def _validate_ast(self, parsed: ParsedFile, file_path: str) -> Dict[str, List[str]]:
+        """Run the type hint and docstring checks in a single pass.
+        
+        Args:
+            parsed: The parsed source file.
+            file_path: Path to the file (for error messages).
+            
+        Returns:
+            Dictionary with ``type_hints`` and ``docstrings`` error lists.
+        """
+        type_hints: List[str] = []
+        docstrings: List[str] = []
+        
+        try:
+            self._check_module_docstring(parsed, file_path, docstrings)
+            for node in parsed.definitions:
+                self._check_type_hints(node, file_path, type_hints)
+                self._check_docstring(node, file_path, docstrings)
+                
+        except Exception as e:
+            logger.error("Error checking %s: %s", file_path, str(e))
+            return {
+                'type_hints': [f"Type hint check failed: {str(e)}"],
+                'docstrings': [f"Docstring check failed: {str(e)}"],
+            }
+            
+        return {'type_hints': type_hints, 'docstrings': docstrings}
+    
+    @staticmethod
+    def _check_type_hints(node: ast.AST, file_path: str, errors: List[str]) -> None:
+        """Append missing annotation errors for a function definition."""
+        if not isinstance(node, ast.FunctionDef):
+            return
+            
+        # Check return type annotation
+        if node.returns is None and not node.name.startswith('_'):
+            errors.append(
+                f"Missing return type annotation for function '{node.name}' "
+                f"in {file_path}:{node.lineno}"
+            )
+        
+        # Check argument type annotations
+        for arg in node.args.args:
+            if arg.annotation is None and not arg.arg.startswith('_'):
+                errors.append(
+                    f"Missing type annotation for parameter '{arg.arg}' "
+                    f"in function '{node.name}' in {file_path}:{node.lineno}"
+                )
+    
+    @staticmethod
+    def _check_module_docstring(parsed: ParsedFile, file_path: str, errors: List[str]) -> None:
+        """Append an error if the module has no docstring."""
+        if parsed.content.lstrip().startswith((b'"""', b"'''")):
+            return
+        if not _has_docstring(parsed.tree):
+            errors.append(f"Missing module docstring in {file_path}")
+    
+    @staticmethod
+    def _check_docstring(node: ast.AST, file_path: str, errors: List[str]) -> None:
+        """Append an error if a function or class has no docstring."""
+        if not _has_docstring(node):
+            node_type = 'function' if isinstance(node, _FUNC_NODES) else 'class'
+            errors.append(
+                f"Missing {node_type} docstring for '{node.name}' in {file_path}:{node.lineno}"
+            )
+    
     def run_external_linter(
         self, 
         file_path: Union[str, Path], 
@@ -205,6 +538,9 @@ class CodeValidator:
     ) -> Tuple[bool, str]:
         """Run an external linter on the given file.
         
+        The file passes under the same rule as
+        :meth:`run_external_linter_batch`, which does the work.
+        
         Args:
             file_path: Path to the file to lint.
             linter: Name of the linter to use (e.g., 'pylint', 'flake8').
@@ -213,24 +549,78 @@ class CodeValidator:
             Tuple of (success, output) where success is a boolean indicating
             if the linting passed, and output is the linter output.
         """
+        return self.run_external_linter_batch([Path(file_path)], linter)[str(file_path)]
+    
+    def run_external_linter_batch(
+        self,
+        file_paths: List[Path],
+        linter: str = "pylint"
+    ) -> Dict[str, Tuple[bool, str]]:
+        """Run an external linter once over many files.
+        
+        Linter start-up (interpreter and plugin imports) dominates on small
+        files, so one invocation is shared by the whole batch and its output
+        is split back out per file.
+        
+        A file fails when the linter reports a message for it, except
+        pylint's informational (``I``) messages. Every file fails when the
+        linter itself fails: a negative exit status, pylint's usage-error
+        bit (32), or any status other than 0 or 1 from other linters.
+        
+        Args:
+            file_paths: Paths of the files to lint.
+            linter: Name of the linter to use (e.g., 'pylint', 'flake8').
+            
+        Returns:
+            Dictionary mapping each path (as ``str``) to a ``(success, output)``
+            tuple. A missing linter counts as a pass.
+        """
+        import subprocess
+        
+        paths = [str(p) for p in file_paths]
+        if not paths:
+            return {}
+        
+        is_pylint = Path(linter).name == 'pylint'
+        cmd = [linter, *_PYLINT_ARGS, *paths] if is_pylint else [linter, *paths]
+        
+        # Match the linter's reported paths back to the caller's spelling
+        by_abspath = {os.path.abspath(p): p for p in paths}
+        lines: Dict[str, List[str]] = {p: [] for p in paths}
+        failed = set()
+        unmatched: List[str] = []
+        
         try:
-            result = subprocess.run(
-                [linter, str(file_path)],
-                capture_output=True,
+            with subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
-                check=False
-            )
-            
-            # Consider it a pass if the linter returns 0 or 1 (some linters use 1 for warnings)
-            success = result.returncode in (0, 1)
-            output = result.stdout or result.stderr
-            
-            return success, output
-            
+                bufsize=1
+            ) as proc:
+                # Attribute each message as it arrives rather than buffering it all
+                for line in proc.stdout:
+                    line = line.rstrip('\n')
+                    attributed = _attribute_lint_line(line, by_abspath)
+                    if attributed is None:
+                        unmatched.append(line)
+                        continue
+                    path, code = attributed
+                    lines[path].append(line)
+                    if not (is_pylint and code[:1] == 'I'):
+                        failed.add(path)
         except FileNotFoundError:
             logger.warning("Linter '%s' not found", linter)
-            return True, f"Linter '{linter}' not installed"
-            
+            return {p: (True, f"Linter '{linter}' not installed") for p in paths}
         except Exception as e:
             logger.error("Error running linter '%s': %s", linter, str(e))
-            return False, f"Error running linter: {str(e)}"
+            return {p: (False, f"Error running linter: {str(e)}") for p in paths}
+        
+        # pylint's exit status is a bit mask of message categories (32 = usage
+        # error); other linters exit 1 for findings and higher for failures
+        returncode = proc.returncode
+        if returncode < 0 or (returncode & 32 if is_pylint else returncode not in (0, 1)):
+            output = "\n".join(unmatched)
+            return {p: (False, output) for p in paths}
+        
+        return {p: (p not in failed, "\n".join(lines[p])) for p in paths}
@@ -4,11 +4,15 @@ Response Parser for LLM API responses.
 This module provides the ResponseParser class which is responsible for parsing
 and validating responses from the LLM API.
 """
-from typing import Dict, Any, Optional, List, TypeVar, Generic, Type
+from collections import ChainMap
+from typing import Dict, Any, Callable, Optional, List, Mapping, Tuple, TypeVar, Generic, Type, Union
 from pydantic import BaseModel, ValidationError
+from pydantic import VERSION as PYDANTIC_VERSION
 
 T = TypeVar('T', bound=BaseModel)
 
+_PYDANTIC_V2 = int(PYDANTIC_VERSION.split('.', 1)[0]) >= 2
+
 class ResponseParser(Generic[T]):
     """Parser for LLM API responses.
     
@@ -24,12 +28,40 @@ class ResponseParser(Generic[T]):
                          response structure.
         """
         self.response_model = response_model
+        self._validator, self._json_validator = self._bind_validators(response_model)
+        # Only BaseModel validation accepts arbitrary mappings such as ChainMap
+        self._accepts_mapping = (
+            _PYDANTIC_V2
+            and isinstance(response_model, type)
+            and issubclass(response_model, BaseModel)
+        )
+    
+    @staticmethod
+    def _bind_validators(
+        response_model: Type[T]
+    ) -> Tuple[Callable[[Any], T], Callable[[Union[str, bytes]], T]]:
+        """Resolve the model's validation entry points once, up front."""
+        if not _PYDANTIC_V2:
+            return response_model.parse_obj, response_model.parse_raw
+        if isinstance(response_model, type) and issubclass(response_model, BaseModel):
+            if response_model.__pydantic_complete__:
+                # Call the compiled schema validator directly, skipping the
+                # model_validate wrapper; it already runs as native code
+                core = response_model.__pydantic_validator__
+                return core.validate_python, core.validate_json
+            return response_model.model_validate, response_model.model_validate_json
+        
+        # Any other type pydantic understands (dataclasses, TypedDicts, ...)
+        from pydantic import TypeAdapter
+        adapter = TypeAdapter(response_model)
+        return adapter.validate_python, adapter.validate_json
     
-    def parse(self, response_data: Dict[str, Any]) -> T:
+    def parse(self, response_data: Union[Mapping[str, Any], str, bytes]) -> T:
         """Parse and validate the response data.
         
         Args:
-            response_data: The raw response data from the LLM API.
+            response_data: The raw response data from the LLM API, either
+                already decoded (any mapping) or as a JSON string/bytes.
             
         Returns:
             An instance of the response model with the parsed data.
@@ -38,7 +70,9 @@ class ResponseParser(Generic[T]):
             ValidationError: If the response data doesn't match the expected schema.
         """
         try:
-            return self.response_model(**response_data)
+            if isinstance(response_data, (str, bytes)):
+                return self._json_validator(response_data)
+            return self._validator(response_data)
         except ValidationError as e:
             # Log the validation error for debugging
             print(f"Validation error parsing LLM response: {e}")
@@ -53,11 +87,30 @@ class ResponseParser(Generic[T]):
         Returns:
             An instance of the response model with the combined data.
         """
-        # Combine chunks into a single response
-        combined = {}
+        if chunks and self._is_delta_stream(chunks):
+            # Chat-completion deltas: the model payload is the concatenated text
+            return self.parse(''.join(
+                (choice.get('delta') or {}).get('content') or ''
+                for chunk in chunks
+                for choice in (chunk.get('choices') or ())[:1]
+            ))
+        
+        # Later chunks take precedence, as with successive dict updates
+        combined = ChainMap(*reversed(chunks))
+        return self.parse(combined if self._accepts_mapping else dict(combined))
+    
+    @staticmethod
+    def _is_delta_stream(chunks: List[Dict[str, Any]]) -> bool:
+        """Whether chunks look like ``{'choices': [{'delta': {...}}]}``.
+        
+        Chunks with empty or missing ``choices``, such as the leading or
+        usage-only chunks some providers send, don't decide either way.
+        """
         for chunk in chunks:
-            combined.update(chunk)
-        return self.parse(combined)
+            choices = chunk.get('choices')
+            if choices and isinstance(choices, list):
+                return 'delta' in choices[0]
+        return False
     
     @classmethod
     def get_default_parser(cls, response_model: Type[T]) -> 'ResponseParser[T]':
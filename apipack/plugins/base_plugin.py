@@ -5,23 +5,38 @@ This module provides the base plugin system for extending APIpack functionality.
 It includes the BasePlugin abstract base class that all plugins must implement,
 and the PluginManager class for managing plugin lifecycle and discovery.
 """
-import importlib
-import inspect
+import heapq
 import logging
-import pkgutil
+import re
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type, TypeVar, Union, cast
+from typing import Any, ClassVar, Dict, List, Optional, Type, TypeVar, Union, cast
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 logger = logging.getLogger(__name__)
 
 # Type variable for the plugin type
 T = TypeVar("T", bound="BasePlugin")
 
+# Position before each capital letter except the first
+_CAMEL_BOUNDARY_RE = re.compile(r'(?<!^)(?=[A-Z])')
+
+
+def _plugin_name(class_name: str) -> str:
+    """Convert a plugin class name to snake_case, dropping any 'Plugin' suffix."""
+    if class_name.endswith("Plugin"):
+        class_name = class_name[:-6]
+    return _CAMEL_BOUNDARY_RE.sub('_', class_name).lower().lstrip('_')
+
+
 class PluginConfig(BaseModel):
-    """Base configuration model for plugins."""
+    """Base configuration model for plugins.
+    
+    Configs are immutable (and therefore hashable) once a plugin is built.
+    """
+    model_config = ConfigDict(frozen=True)
+    
     enabled: bool = True
     priority: int = 100  # Lower numbers are higher priority
     
@@ -32,25 +47,37 @@ class BasePlugin(ABC):
     to extend or modify functionality.
     """
     
+    _cached_name: ClassVar[str] = _plugin_name("BasePlugin")
+    # Resolved from get_config_class() on first instantiation, so overrides
+    # may return classes defined later in the plugin's module
+    _config_cls: ClassVar[Optional[Type[PluginConfig]]] = None
+    
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._cached_name = _plugin_name(cls.__name__)
+        cls._config_cls = None
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize the plugin with optional configuration.
         
         Args:
             config: Plugin configuration dictionary.
         """
-        self.config = self.get_config_class()(**(config or {}))
+        config_cls = type(self)._config_cls
+        if config_cls is None:
+            config_cls = type(self)._config_cls = self.get_config_class()
+        self.config = config_cls(**config) if config else config_cls()
+        self._priority = getattr(self.config, 'priority', 100)
         self._initialized = False
     
     @classmethod
     def get_name(cls) -> str:
         """Get the plugin's name.
         
-        By default, returns the class name in snake_case.
+        By default, returns the class name in snake_case, computed once
+        when the class is defined.
         """
-        name = cls.__name__
-        if name.endswith("Plugin"):
-            name = name[:-6]  # Remove 'Plugin' suffix if present
-        return "".join(["_" + c.lower() if c.isupper() else c for c in name]).lstrip("_")
+        return cls._cached_name
     
     @classmethod
     def get_config_class(cls) -> Type[PluginConfig]:
@@ -134,7 +161,12 @@ class BasePlugin(ABC):
 
 
 class PluginManager:
-    """Manages the loading and lifecycle of plugins."""
+    """Manages the loading and lifecycle of plugins.
+    
+    Loaded plugins are cleaned up on exit when the manager is used as a
+    context manager (``with PluginManager() as manager: ...``); otherwise
+    callers must call :meth:`unload_all` themselves.
+    """
     
     def __init__(self, plugin_dirs: Optional[List[Union[str, Path]]] = None):
         """Initialize the plugin manager.
@@ -145,6 +177,8 @@ class PluginManager:
         self.plugins: Dict[str, BasePlugin] = {}
         self.plugin_dirs = [Path(d) for d in (plugin_dirs or [])]
         self._discovered_plugins: Dict[str, Type[BasePlugin]] = {}
+        # Plugins found per package, so repeat discovery skips the walk
+        self._discovery_cache: Dict[str, Dict[str, Type[BasePlugin]]] = {}
     
     def discover_plugins(self, package_paths: Optional[List[str]] = None) -> None:
         """Discover plugins in the specified packages.
@@ -152,28 +186,51 @@ class PluginManager:
         Args:
             package_paths: List of package paths to search for plugins.
         """
+        import importlib
+        
         if package_paths is None:
             package_paths = ["apipack.plugins"]
             
         for package_path in package_paths:
-            try:
-                package = importlib.import_module(package_path)
-                self._discover_plugins_in_package(package)
-            except ImportError as e:
-                logger.warning("Failed to import package %s: %s", package_path, e)
+            found = self._discovery_cache.get(package_path)
+            if found is None:
+                try:
+                    package = importlib.import_module(package_path)
+                except ImportError as e:
+                    logger.warning("Failed to import package %s: %s", package_path, e)
+                    continue
+                found = self._discovery_cache[package_path] = (
+                    self._discover_plugins_in_package(package)
+                )
+                
+            for plugin_name, obj in found.items():
+                registered = self._discovered_plugins.setdefault(plugin_name, obj)
+                if registered is not obj:
+                    logger.warning(
+                        "Plugin %s already registered, skipping %s",
+                        plugin_name, obj.__module__
+                    )
     
-    def _discover_plugins_in_package(self, package: Any) -> None:
+    def _discover_plugins_in_package(self, package: Any) -> Dict[str, Type[BasePlugin]]:
         """Discover plugins in a package.
         
         Args:
             package: The package to search for plugins.
+            
+        Returns:
+            Dictionary mapping plugin names to the plugin classes found.
         """
+        import importlib
+        import inspect
+        import pkgutil
+        
+        found: Dict[str, Type[BasePlugin]] = {}
         try:
-            package_path = Path(package.__file__).parent if hasattr(package, '__file__') else None
+            package_path = Path(package.__file__).parent if getattr(package, '__file__', None) else None
             
             # Skip if this is a namespace package without a __file__
             if package_path is None:
-                return
+                return found
                 
             for finder, name, _ in pkgutil.iter_modules([str(package_path)]):
                 try:
@@ -184,19 +241,19 @@ class PluginManager:
                     full_name = f"{package.__name__}.{name}"
                     module = importlib.import_module(full_name)
                     
-                    # Find all plugin classes in the module
-                    for _, obj in inspect.getmembers(module, inspect.isclass):
-                        if (issubclass(obj, BasePlugin) and 
+                    # Find all plugin classes defined in or imported by the module
+                    for obj in vars(module).values():
+                        if (isinstance(obj, type) and 
+                                issubclass(obj, BasePlugin) and 
                                 obj is not BasePlugin and 
                                 not inspect.isabstract(obj)):
                             plugin_name = obj.get_name()
-                            if plugin_name in self._discovered_plugins:
+                            if found.setdefault(plugin_name, obj) is not obj:
                                 logger.warning(
                                     "Plugin %s already registered, skipping %s",
                                     plugin_name, full_name
                                 )
                             else:
-                                self._discovered_plugins[plugin_name] = obj
                                 logger.debug("Discovered plugin: %s", plugin_name)
                                     
                 except Exception as e:
@@ -204,6 +261,8 @@ class PluginManager:
                     
         except Exception as e:
             logger.error("Error discovering plugins in package %s: %s", package, e, exc_info=True)
+            
+        return found
     
     def load_plugin(self, plugin_name: str, config: Optional[Dict[str, Any]] = None) -> Optional[BasePlugin]:
         """Load a plugin by name.
@@ -243,19 +302,22 @@ class PluginManager:
         Returns:
             Dictionary of loaded plugin instances.
         """
-        loaded = {}
+        heap = []
         
         for plugin_name, config in plugin_configs.items():
             if config is None or config.get('enabled', True):
                 plugin = self.load_plugin(plugin_name, config)
                 if plugin:
-                    loaded[plugin_name] = plugin
+                    # Index breaks ties in load order and keeps plugins uncompared
+                    heap.append((plugin._priority, len(heap), plugin_name, plugin))
                     
-        # Sort plugins by priority (lower number = higher priority)
-        return dict(sorted(
-            loaded.items(),
-            key=lambda x: x[1].config.priority if hasattr(x[1].config, 'priority') else 100
-        ))
+        # Order plugins by priority (lower number = higher priority)
+        heapq.heapify(heap)
+        loaded = {}
+        while heap:
+            _, _, plugin_name, plugin = heapq.heappop(heap)
+            loaded[plugin_name] = plugin
+        return loaded
     
     def unload_plugin(self, plugin_name: str) -> None:
         """Unload a plugin.
@@ -310,10 +372,6 @@ class PluginManager:
         """Context manager exit - unload all plugins."""
         self.unload_all()
         return False
-    
-    def __del__(self):
-        """Destructor - ensure all plugins are properly cleaned up."""
-        self.unload_all()
 
 
 def get_plugin_manager() -> PluginManager:
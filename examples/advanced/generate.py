@@ -6,7 +6,7 @@ import sys
 import asyncio
 import yaml
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, ClassVar, Dict, List
 
 # Add the project root to the Python path
 project_root = str(Path(__file__).parent.parent.parent.parent)
@@ -19,10 +19,37 @@ from apipack.templates.registry import TemplateRegistry
 class AdvancedExampleGenerator:
     """Generator for the advanced TODO API example."""
     
+    # Static per-language settings; go's module_path depends on the project
+    _LANGUAGE_CONFIGS: ClassVar[Dict[str, Dict[str, str]]] = {
+        'python': {
+            'package_manager': 'poetry',
+            'test_framework': 'pytest',
+            'async_framework': 'asyncio',
+        },
+        'javascript': {
+            'package_manager': 'npm',
+            'test_framework': 'jest',
+            'runtime': 'node',
+        },
+        'go': {
+            'test_framework': 'testing',
+        },
+        'rust': {
+            'edition': '2021',
+            'test_framework': 'cargo_test',
+        },
+    }
+    
     def __init__(self, config_path: str):
         """Initialize with path to config file."""
         self.config_path = Path(config_path)
         self.config = self._load_config()
+        
+        # Derived once; generate() reads these for every language
+        self._function_specs = self.config.get('functions', [])
+        self._interfaces = [i['type'] for i in self.config.get('interfaces', [])]
+        self._languages = [lang['name'] for lang in self.config.get('languages', [])]
+        
         self.engine = APIPackEngine()
         
         # Configure template registry with custom templates
@@ -32,7 +59,8 @@ class AdvancedExampleGenerator:
     def _load_config(self) -> Dict[str, Any]:
         """Load and validate the configuration."""
         with open(self.config_path, 'r') as f:
-            return yaml.safe_load(f)
+            # libyaml's loader when available; same safety, much faster
+            return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
     
     def _register_custom_templates(self):
         """Register any custom templates for this example."""
@@ -42,15 +70,15 @@ class AdvancedExampleGenerator:
     
     def _get_function_specs(self) -> List[Dict[str, Any]]:
         """Extract function specifications from config."""
-        return self.config.get('functions', [])
+        return self._function_specs
     
     def _get_interfaces(self) -> List[str]:
         """Get list of interfaces to generate."""
-        return [i['type'] for i in self.config.get('interfaces', [])]
+        return self._interfaces
     
     def _get_target_languages(self) -> List[str]:
         """Get list of target languages."""
-        return [lang['name'] for lang in self.config.get('languages', [])]
+        return self._languages
     
     async def generate(self, output_dir: str = "generated/advanced-todo"):
         """Generate the API package."""
@@ -65,53 +93,46 @@ class AdvancedExampleGenerator:
         print(f"Interfaces: {', '.join(self._get_interfaces())}")
         print("=" * 50)
         
-        # Generate for each target language
-        for language in self._get_target_languages():
-            print(f"\n🌍 Generating {language.upper()} implementation...")
-            
-            # Configure language-specific settings
-            language_config = self._get_language_config(language)
-            
-            # Generate the package
-            result = await self.engine.generate_package_async(
-                function_specs=self._get_function_specs(),
-                interfaces=self._get_interfaces(),
-                language=language,
-                output_dir=output_path / language,
-                project_name=self.config['name'].replace('-', '_'),
-                version=self.config['version'],
-                description=self.config['description'],
-                author=self.config.get('author', ''),
-                license=self.config.get('license', ''),
-                **language_config
-            )
-            
+        # Languages generate into separate directories, so run them concurrently
+        languages = self._get_target_languages()
+        results = await asyncio.gather(*[
+            self._generate_one(language, output_path) for language in languages
+        ])
+        
+        # Report once everything is done so output doesn't interleave
+        for language, result in zip(languages, results):
             self._print_generation_result(result, language)
     
+    async def _generate_one(self, language: str, output_path: Path) -> Any:
+        """Generate the package for a single target language."""
+        print(f"\n🌍 Generating {language.upper()} implementation...")
+        
+        # Configure language-specific settings
+        language_config = self._get_language_config(language)
+        
+        # Generate the package
+        return await self.engine.generate_package_async(
+            function_specs=self._get_function_specs(),
+            interfaces=self._get_interfaces(),
+            language=language,
+            output_dir=output_path / language,
+            project_name=self.config['name'].replace('-', '_'),
+            version=self.config['version'],
+            description=self.config['description'],
+            author=self.config.get('author', ''),
+            license=self.config.get('license', ''),
+            **language_config
+        )
+    
     def _get_language_config(self, language: str) -> Dict[str, Any]:
         """Get language-specific configuration."""
         # In a real implementation, this would return framework versions,
         # build tools, and other language-specific settings
-        return {
-            'python': {
-                'package_manager': 'poetry',
-                'test_framework': 'pytest',
-                'async_framework': 'asyncio',
-            },
-            'javascript': {
-                'package_manager': 'npm',
-                'test_framework': 'jest',
-                'runtime': 'node',
-            },
-            'go': {
-                'module_path': f'github.com/username/{self.config["name"]}',
-                'test_framework': 'testing',
-            },
-            'rust': {
-                'edition': '2021',
-                'test_framework': 'cargo_test',
-            },
-        }.get(language.lower(), {})
+        language = language.lower()
+        config = dict(self._LANGUAGE_CONFIGS.get(language, {}))
+        if language == 'go':
+            config['module_path'] = f'github.com/username/{self.config["name"]}'
+        return config
     
     def _print_generation_result(self, result: Any, language: str):
         """Print the result of package generation."""
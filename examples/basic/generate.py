@@ -19,7 +19,7 @@ async def main():
     # Load the configuration
     config_path = Path(__file__).parent / "config.yml"
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
     
     # Initialize the APIpack engine
     engine = APIPackEngine()
@@ -1,23 +1,10 @@
-"""Run test directly to debug import issues."""
-import sys
-import os
-
-# Add the src directory to the Python path
-sys.path.insert(0, os.path.abspath("."))
-sys.path.insert(0, os.path.abspath("src"))
+"""Run the test suite; arguments are passed through to pytest.
 
-print("Python path:", sys.path)
-print("\nContents of src:", os.listdir("src"))
-print("Contents of src/apipack:", os.listdir("src/apipack"))
-
-try:
-    import apipack
+Imports resolve through the editable install (``pip install -e .``) and the
+``pythonpath`` setting in pytest.ini, so no path manipulation is needed.
+"""
+import sys
 
-    print("\nSuccessfully imported apipack!")
-    print(f"apipack module: {apipack}")
-    print(f"apipack.__file__: {apipack.__file__}")
-except ImportError as e:
-    print(f"\nFailed to import apipack: {e}")
-    import traceback
+import pytest
 
-    traceback.print_exc()
+raise SystemExit(pytest.main(sys.argv[1:]))
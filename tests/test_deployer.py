@@ -0,0 +1,141 @@
+"""Tests for the package deployer's archive and build-log helpers."""
+import tarfile
+import threading
+import zipfile
+
+import pytest
+
+from apipack.core import deployer
+from apipack.core.deployer import PackageDeployer, _drain_build_logs
+
+
+@pytest.fixture
+def package(tmp_path):
+    """A small package tree with nested, empty and pre-compressed entries."""
+    root = tmp_path / "demo"
+    (root / "demo" / "static").mkdir(parents=True)
+    (root / "empty").mkdir()
+    (root / "setup.py").write_text("from setuptools import setup\nsetup()\n")
+    (root / "demo" / "__init__.py").write_text("VERSION = '1.0'\n" * 100)
+    (root / "demo" / "static" / "logo.PNG").write_bytes(b"\x89PNG" * 100)
+    return root
+
+
+def _expected_files(root):
+    """Map archive names to contents for every file below ``root``."""
+    return {
+        f"{root.name}/{path.relative_to(root).as_posix()}": path.read_bytes()
+        for path in root.rglob("*") if path.is_file()
+    }
+
+
+def test_create_package_archive_tar_gz_round_trip(package, tmp_path):
+    """A tar.gz archive holds every file and directory under the package name."""
+    archive = PackageDeployer().create_package_archive(package, tmp_path / "dist")
+
+    assert archive == tmp_path / "dist" / "demo.tar.gz"
+    with tarfile.open(archive) as tar:
+        files = {
+            m.name: tar.extractfile(m).read() for m in tar.getmembers() if m.isreg()
+        }
+        dirs = {m.name for m in tar.getmembers() if m.isdir()}
+    assert files == _expected_files(package)
+    assert dirs == {"demo", "demo/demo", "demo/demo/static", "demo/empty"}
+
+
+def test_create_package_archive_zip_round_trip(package, tmp_path):
+    """Zip members round-trip; already-compressed files are stored, not deflated."""
+    archive = PackageDeployer().create_package_archive(
+        package, tmp_path / "dist", format="zip"
+    )
+
+    with zipfile.ZipFile(archive) as zipf:
+        files = {
+            info.filename: zipf.read(info)
+            for info in zipf.infolist() if not info.is_dir()
+        }
+        methods = {info.filename: info.compress_type for info in zipf.infolist()}
+        assert zipf.testzip() is None
+    assert files == _expected_files(package)
+    assert "demo/empty/" in methods
+    assert methods["demo/demo/static/logo.PNG"] == zipfile.ZIP_STORED
+    assert methods["demo/setup.py"] == zipfile.ZIP_DEFLATED
+
+
+def test_create_package_archive_rejects_unknown_format(package, tmp_path):
+    """Unsupported formats raise instead of writing an archive."""
+    with pytest.raises(ValueError):
+        PackageDeployer().create_package_archive(package, tmp_path, format="rar")
+
+
+def test_zip_reader_error_surfaces_and_stops_reader(package, tmp_path, monkeypatch):
+    """A reader-thread failure is raised in the caller after the reader exits."""
+    read_entry = deployer._read_entry
+
+    def failing_read_entry(entry):
+        if entry.name == "setup.py":
+            raise PermissionError("denied")
+        return read_entry(entry)
+
+    monkeypatch.setattr(deployer, "_read_entry", failing_read_entry)
+    before = set(threading.enumerate())
+
+    with pytest.raises(PermissionError):
+        deployer._write_zip_archive(tmp_path / "demo.zip", str(package), "demo")
+
+    assert set(threading.enumerate()) <= before
+
+
+def test_drain_build_logs_keeps_tail_and_writes_full_log(tmp_path):
+    """Only the last chunks are kept in memory; the log file gets every line."""
+    chunks = [{"stream": f"step {i}\n"} for i in range(500)]
+    chunks.append({"aux": {"ID": "sha256:abc"}})
+    log_file = tmp_path / "build.log"
+
+    tail = _drain_build_logs(iter(chunks), log_file)
+
+    assert tail == chunks[-deployer._BUILD_LOG_TAIL:]
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 501
+    assert lines[0] == "step 0"
+    assert lines[-1] == '{"aux": {"ID": "sha256:abc"}}'
+
+
+def test_drain_build_logs_without_log_file():
+    """Without a log file the stream is still consumed down to its tail."""
+    chunks = ({"stream": f"step {i}\n"} for i in range(300))
+
+    tail = _drain_build_logs(chunks)
+
+    assert len(tail) == deployer._BUILD_LOG_TAIL
+    assert tail[0] == {"stream": "step 100\n"}
+    assert next(chunks, None) is None
+
+
+def test_docker_client_failures_are_retried(monkeypatch):
+    """An unreachable daemon is retried; the first working client is reused."""
+    docker = deployer._lazy_import_docker()
+    client = type("FakeClient", (), {"ping": lambda self: True})()
+    attempts = []
+
+    def from_env():
+        attempts.append(None)
+        if len(attempts) == 1:
+            raise docker.errors.DockerException("daemon not running")
+        return client
+
+    monkeypatch.setattr(deployer, "_docker_client", None)
+    monkeypatch.setattr(docker, "from_env", from_env)
+
+    assert PackageDeployer().docker_client is None
+    assert PackageDeployer().docker_client is client
+    assert PackageDeployer().docker_client is client
+    assert len(attempts) == 2
+
+
+@pytest.mark.parametrize("version", ["3.11", 3.11])
+def test_generate_dockerfile_formats_python_version(tmp_path, version):
+    """String and numeric (YAML-parsed) Python versions both render."""
+    PackageDeployer()._generate_dockerfile(tmp_path, python_version=version)
+
+    assert "FROM python:3.11-slim\n" in (tmp_path / "Dockerfile").read_text()
@@ -0,0 +1,287 @@
+"""Tests for the file utilities."""
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from apipack.utils import file_utils
+from apipack.utils.file_utils import (
+    copy_file,
+    create_temp_file,
+    ensure_directory,
+    find_files,
+    get_file_hash,
+    hash_directory,
+    hash_files,
+    is_empty_directory,
+    iter_files,
+    read_file,
+    remove_file_or_dir,
+    write_file,
+)
+
+
+def test_get_file_hash_matches_hashlib(tmp_path):
+    """Digests match hashlib for constructor and non-constructor names."""
+    path = tmp_path / "data.bin"
+    data = bytes(range(256)) * 5000
+    path.write_bytes(data)
+
+    for algorithm in ("sha256", "blake2b", "sha3_256"):
+        assert get_file_hash(path, algorithm) == hashlib.new(algorithm, data).hexdigest()
+
+    with pytest.raises(ValueError):
+        get_file_hash(path, "not-a-hash")
+
+
+def test_get_file_hash_chunked_fallback(tmp_path, monkeypatch):
+    """The readinto loop produces the same digest as file_digest."""
+    path = tmp_path / "data.bin"
+    data = bytes(range(256)) * 5000
+    path.write_bytes(data)
+
+    monkeypatch.delattr(hashlib, "file_digest", raising=False)
+
+    assert get_file_hash(path, chunk_size=1000) == hashlib.sha256(data).hexdigest()
+
+
+def test_copy_file_copies_data_and_mode(tmp_path):
+    """Copies carry the data and permission bits, and honour overwrite."""
+    src = tmp_path / "src.sh"
+    src.write_bytes(b"#!/bin/sh\n" * 1000)
+    src.chmod(0o750)
+
+    dst = copy_file(src, tmp_path / "out" / "dst.sh", preserve_metadata=False)
+
+    assert dst.read_bytes() == src.read_bytes()
+    assert dst.stat().st_mode & 0o777 == 0o750
+    with pytest.raises(FileExistsError):
+        copy_file(src, dst)
+    assert copy_file(src, tmp_path / "out", overwrite=True) == (tmp_path / "out" / "src.sh").resolve()
+
+
+def test_find_files_matches_names_recursively(tmp_path):
+    """Name patterns match at any depth; directories only when requested."""
+    (tmp_path / "pkg" / "sub").mkdir(parents=True)
+    for rel in ("a.py", "pkg/b.py", "pkg/sub/c.py", "pkg/notes.txt"):
+        (tmp_path / rel).write_text("")
+
+    assert find_files(tmp_path, "*.py") == [
+        Path("a.py"), Path("pkg/b.py"), Path("pkg/sub/c.py"),
+    ]
+    assert find_files(tmp_path, "*.py", recursive=False) == [Path("a.py")]
+    assert find_files(tmp_path, "s*", include_dirs=True, include_files=False) == [
+        Path("pkg/sub"),
+    ]
+    assert find_files(tmp_path, "sub/*.py") == [Path("pkg/sub/c.py")]
+
+
+def test_get_file_hash_memoizes_until_file_changes(tmp_path, monkeypatch):
+    """Unchanged files are not re-read; changed files are re-hashed."""
+    path = tmp_path / "data.txt"
+    path.write_text("one")
+    first = get_file_hash(path)
+
+    monkeypatch.setattr(file_utils, "_hash_file", None)  # Any re-hash would fail
+    assert get_file_hash(path) == first
+    monkeypatch.undo()
+
+    path.write_text("three")
+    assert get_file_hash(path) == hashlib.sha256(b"three").hexdigest()
+
+    get_file_hash.cache_clear()
+    assert get_file_hash(path) == hashlib.sha256(b"three").hexdigest()
+
+
+def test_get_file_hash_blake3(tmp_path):
+    """'blake3' uses the blake3 package, or 32-byte BLAKE2b without it."""
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"payload")
+
+    try:
+        from blake3 import blake3
+    except ImportError:
+        expected = hashlib.blake2b(b"payload", digest_size=32).hexdigest()
+    else:
+        expected = blake3(b"payload").hexdigest()
+
+    assert get_file_hash(path, "blake3") == expected
+
+
+def test_remove_file_or_dir_unlinks_symlink_not_target(tmp_path):
+    """Removing a symlink leaves the file it points to in place."""
+    target = tmp_path / "target.txt"
+    target.write_text("keep")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+
+    remove_file_or_dir(link)
+
+    assert not os.path.lexists(link)
+    assert target.read_text() == "keep"
+
+
+def test_copy_file_falls_back_to_buffered_copy(tmp_path, monkeypatch):
+    """When copy_file_range is rejected the data is streamed in user space."""
+    def reject(*args):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "copy_file_range", reject, raising=False)
+    src = tmp_path / "src.bin"
+    src.write_bytes(os.urandom(3 * 1024 * 1024 + 5))
+
+    dst = copy_file(src, tmp_path / "dst.bin")
+
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_copy_file_refuses_to_copy_onto_itself(tmp_path):
+    """Copying a file onto itself or a symlink to it leaves the data intact."""
+    src = tmp_path / "src.bin"
+    src.write_bytes(b"payload" * 1000)
+    link = tmp_path / "link.bin"
+    link.symlink_to(src)
+
+    for dst in (src, link):
+        with pytest.raises(shutil.SameFileError):
+            copy_file(src, dst, overwrite=True)
+
+    assert src.read_bytes() == b"payload" * 1000
+
+
+def test_iter_files_is_lazy_and_validates_eagerly(tmp_path):
+    """iter_files checks the directory up front and yields matches lazily."""
+    (tmp_path / "a.py").write_text("")
+    (tmp_path / "b.py").write_text("")
+
+    assert sorted(iter_files(tmp_path, "*.py")) == find_files(tmp_path, "*.py")
+    assert any(path.name == "a.py" for path in iter_files(tmp_path))
+    with pytest.raises(NotADirectoryError):
+        iter_files(tmp_path / "missing")
+
+
+def test_ensure_directory_sets_mode_and_recreates(tmp_path):
+    """Directories get the requested mode and are recreated if removed."""
+    directory = tmp_path / "a" / "b"
+
+    assert ensure_directory(directory, mode=0o700) == directory
+    assert directory.stat().st_mode & 0o777 == 0o700
+
+    directory.rmdir()
+    ensure_directory(directory, mode=0o700)
+    assert directory.is_dir()
+
+
+def test_hash_files_matches_get_file_hash(tmp_path):
+    """Concurrent hashing returns the same digests as serial calls."""
+    paths = []
+    for i in range(8):
+        path = tmp_path / f"file_{i}.txt"
+        path.write_text(str(i) * (i + 1))
+        paths.append(path)
+
+    assert hash_files(paths, workers=4) == {p: get_file_hash(p) for p in paths}
+    assert hash_files([]) == {}
+
+
+def test_get_file_hash_blake3_large_file(tmp_path):
+    """Large files hashed with threaded BLAKE3 match a one-shot digest."""
+    blake3 = pytest.importorskip("blake3").blake3
+    path = tmp_path / "large.bin"
+    data = os.urandom(3 * 1024 * 1024)
+    path.write_bytes(data)
+
+    assert get_file_hash(path, "blake3") == blake3(data).hexdigest()
+
+
+def test_read_file_large_file_translates_newlines(tmp_path, monkeypatch):
+    """The mmap path decodes like read_text, including newline handling."""
+    monkeypatch.setattr(file_utils, "_MMAP_MIN", 1)
+    path = tmp_path / "big.txt"
+    path.write_bytes("héllo\r\nold\rmac\n".encode("utf-8"))
+
+    assert read_file(path) == "héllo\nold\nmac\n"
+    assert get_file_hash(path) == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_is_empty_directory(tmp_path):
+    """Missing and empty directories are empty; files and populated ones are not."""
+    assert is_empty_directory(tmp_path / "missing")
+    assert is_empty_directory(tmp_path)
+
+    (tmp_path / "file.txt").write_text("x")
+    assert not is_empty_directory(tmp_path)
+    assert not is_empty_directory(tmp_path / "file.txt")
+
+
+def test_write_file_recreates_removed_parent(tmp_path):
+    """Parent directories removed after being ensured are created again."""
+    target = tmp_path / "out" / "a.txt"
+    write_file(target, "one")
+
+    remove_file_or_dir(tmp_path / "out")
+    write_file(target, "two")
+
+    assert target.read_text() == "two"
+
+
+def test_ensure_directory_fixes_mode_of_existing_directory(tmp_path):
+    """An existing directory with different permissions is chmod-ed, every time."""
+    directory = tmp_path / "existing"
+    directory.mkdir(mode=0o700)
+    directory.chmod(0o700)
+
+    ensure_directory(directory, mode=0o750)
+
+    assert directory.stat().st_mode & 0o777 == 0o750
+
+    directory.chmod(0o700)
+    ensure_directory(directory, mode=0o750)
+
+    assert directory.stat().st_mode & 0o777 == 0o750
+
+
+@pytest.mark.parametrize("algorithm", ["blake3", "sha256"])
+def test_hash_directory_tracks_content_and_names(tmp_path, algorithm):
+    """The tree digest is stable and changes on edits and renames."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+
+    digest = hash_directory(tmp_path, algorithm)
+    assert hash_directory(tmp_path, algorithm) == digest
+
+    (tmp_path / "b.txt").rename(tmp_path / "c.txt")
+    renamed = hash_directory(tmp_path, algorithm)
+    assert renamed != digest
+
+    (tmp_path / "c.txt").write_text("c")
+    assert hash_directory(tmp_path, algorithm) != renamed
+
+
+def test_create_temp_file_keeps_file_when_not_deleting(tmp_path):
+    """With delete=False the file outlives the call and holds the content."""
+    path = create_temp_file("hello", suffix=".txt", dir=tmp_path, delete=False)
+
+    assert path.parent == tmp_path.resolve()
+    assert path.suffix == ".txt"
+    assert path.read_text() == "hello"
+
+
+def test_walk_tree_prunes_sorts_and_skips_symlinked_dirs(tmp_path):
+    """Pruned subtrees are skipped and symlinked directories are not entered."""
+    (tmp_path / "b" / "skip").mkdir(parents=True)
+    (tmp_path / "b" / "skip" / "hidden.txt").write_text("")
+    (tmp_path / "b" / "z.txt").write_text("")
+    (tmp_path / "a.txt").write_text("")
+    (tmp_path / "link").symlink_to(tmp_path / "b", target_is_directory=True)
+
+    walked = [
+        rel_path for _, rel_path in file_utils._walk_tree(
+            tmp_path, lambda entry, rel_path: entry.name == "skip", sort=True, sep="/"
+        )
+    ]
+
+    assert walked == ["a.txt", "b", "b/z.txt", "link"]
@@ -0,0 +1,162 @@
+"""Tests for the template-based CodeGenerator."""
+import os
+import shutil
+
+import pytest
+
+from apipack.core.generator import CodeGenerator
+
+
+def test_environment_is_shared_across_generators(tmp_path):
+    """Generators over the same template dirs reuse one Jinja2 environment."""
+    first = CodeGenerator([str(tmp_path)])
+    second = CodeGenerator([str(tmp_path)])
+    assert first.env is second.env
+
+
+def test_generate_from_spec_does_not_mutate_template_dirs(tmp_path):
+    """A per-call template_dir is used locally, not appended to the generator."""
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "hello.txt.j2").write_text("Hello {{ name }}!")
+
+    generator = CodeGenerator([str(tmp_path / "missing")])
+    spec = {
+        "files": [{"template": "hello.txt.j2", "output": "hello.txt"}],
+        "context": {"name": "world"},
+    }
+    result = generator.generate_from_spec(
+        spec, str(tmp_path / "out"), template_dir=str(templates)
+    )
+
+    assert result["success"] is True
+    assert (tmp_path / "out" / "hello.txt").read_text() == "Hello world!"
+    assert generator.template_dirs == [str(tmp_path / "missing")]
+
+
+def test_generate_directory_skips_excluded_entries(tmp_path):
+    """Excluded files and directories are matched at any depth."""
+    src = tmp_path / "src"
+    (src / "pkg" / "__pycache__").mkdir(parents=True)
+    (src / "pkg" / "__pycache__" / "mod.pyc").write_bytes(b"")
+    (src / "pkg" / "stale.pyc").write_bytes(b"")
+    (src / "pkg" / "data.txt").write_text("data")
+
+    generator = CodeGenerator([str(src)])
+    generated = generator.generate_directory(
+        str(src), str(tmp_path / "out"), {}, exclude=["__pycache__", "*.pyc"]
+    )
+
+    assert generated == [str(tmp_path / "out" / "pkg" / "data.txt")]
+    assert (tmp_path / "out" / "pkg" / "data.txt").read_text() == "data"
+    assert not (tmp_path / "out" / "pkg" / "__pycache__").exists()
+    assert not (tmp_path / "out" / "pkg" / "stale.pyc").exists()
+
+
+def test_generate_from_spec_struct(tmp_path):
+    """A msgspec-decoded spec renders the same as the dict form."""
+    spec_module = pytest.importorskip("apipack.core.spec")
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "hello.txt.j2").write_text("{{ greeting }} {{ name }}!")
+
+    spec = spec_module.decode_spec(
+        '{"files": [{"template": "hello.txt.j2", "output": "hello.txt",'
+        ' "context": {"name": "world"}}], "context": {"greeting": "Hi"}}'
+    )
+    result = CodeGenerator([str(templates)]).generate_from_spec_struct(
+        spec, str(tmp_path / "out")
+    )
+
+    assert result["success"] is True
+    assert (tmp_path / "out" / "hello.txt").read_text() == "Hi world!"
+
+
+def test_generate_directory_onto_itself_keeps_assets(tmp_path):
+    """Copying an asset onto itself fails instead of truncating it."""
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "logo.png").write_bytes(b"\x89PNG" * 100)
+
+    with pytest.raises(shutil.SameFileError):
+        CodeGenerator([str(src)]).generate_directory(
+            str(src), str(src), {}, overwrite=True
+        )
+
+    assert (src / "logo.png").read_bytes() == b"\x89PNG" * 100
+
+
+def test_generate_directory_does_not_follow_directory_symlinks(tmp_path):
+    """A symlinked directory, even a cycle, is not walked into."""
+    src = tmp_path / "src"
+    (src / "pkg").mkdir(parents=True)
+    (src / "pkg" / "data.txt").write_text("data")
+    (src / "pkg" / "loop").symlink_to(src, target_is_directory=True)
+
+    generated = CodeGenerator([str(src)]).generate_directory(
+        str(src), str(tmp_path / "out"), {}
+    )
+
+    assert generated == [str(tmp_path / "out" / "pkg" / "data.txt")]
+
+
+def test_new_generator_renders_edited_template(tmp_path):
+    """An edited template is re-read by generators created afterwards."""
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    template = templates / "version.txt.j2"
+    template.write_text("v1")
+    out = tmp_path / "version.txt"
+
+    CodeGenerator([str(templates)]).generate_file("version.txt.j2", str(out), {})
+    template.write_text("v2")
+    os.utime(template, (1, 1))
+    CodeGenerator([str(templates)]).generate_file(
+        "version.txt.j2", str(out), {}, overwrite=True
+    )
+
+    assert out.read_text() == "v2"
+
+
+def test_template_dir_created_after_first_use(tmp_path):
+    """The current-directory fallback is not reused once the dir exists."""
+    templates = tmp_path / "templates"
+    CodeGenerator([str(templates)])
+
+    templates.mkdir()
+    (templates / "hello.txt.j2").write_text("hello")
+    generator = CodeGenerator([str(templates)])
+    generator.generate_file("hello.txt.j2", str(tmp_path / "hello.txt"), {})
+
+    assert (tmp_path / "hello.txt").read_text() == "hello"
+
+
+def test_generator_reloads_template_edited_between_renders(tmp_path):
+    """A generator's own template memo notices edits to the source."""
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    template = templates / "version.txt.j2"
+    template.write_text("v1")
+    out = tmp_path / "version.txt"
+    generator = CodeGenerator([str(templates)])
+
+    generator.generate_file("version.txt.j2", str(out), {})
+    template.write_text("v2")
+    os.utime(template, (1, 1))
+    generator.generate_file("version.txt.j2", str(out), {}, overwrite=True)
+
+    assert out.read_text() == "v2"
+
+
+def test_exclude_wildcards_stay_within_one_path_component(tmp_path):
+    """Like PurePath.match, ``a/*.py`` does not reach into ``a/b/``."""
+    src = tmp_path / "src"
+    (src / "a" / "b").mkdir(parents=True)
+    (src / "a" / "top.py").write_text("")
+    (src / "a" / "b" / "deep.py").write_text("")
+
+    generated = CodeGenerator([str(src)]).generate_directory(
+        str(src), str(tmp_path / "out"), {}, exclude=["a/*.py"]
+    )
+
+    assert generated == [str(tmp_path / "out" / "a" / "b" / "deep.py")]
@@ -0,0 +1,118 @@
+"""Tests for the plugin system."""
+import pytest
+from pydantic import ValidationError
+
+from apipack.plugins.base_plugin import BasePlugin, PluginConfig, PluginManager
+
+PLUGIN_SOURCE = '''
+from apipack.plugins.base_plugin import BasePlugin
+
+
+class MyExamplePlugin(BasePlugin):
+    """A discoverable plugin."""
+'''
+
+
+def test_discover_plugins_caches_per_package(tmp_path, monkeypatch):
+    """Each package is walked once; later discoveries reuse the result."""
+    package = tmp_path / "demo_plugins"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "example.py").write_text(PLUGIN_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    manager = PluginManager()
+    manager.discover_plugins(["demo_plugins"])
+    assert list(manager._discovered_plugins) == ["my_example"]
+
+    (package / "other.py").write_text(PLUGIN_SOURCE.replace("MyExample", "Other"))
+    manager.discover_plugins(["demo_plugins"])
+    assert list(manager._discovered_plugins) == ["my_example"]
+
+
+def test_get_name_is_snake_case_without_suffix():
+    """Plugin names are derived from the class name when it is defined."""
+    class HTTPClientPlugin(BasePlugin):
+        """Acronyms are split per capital letter."""
+
+    class _PrivateLint(BasePlugin):
+        """Leading underscores are dropped."""
+
+    assert BasePlugin.get_name() == "base"
+    assert HTTPClientPlugin.get_name() == "h_t_t_p_client"
+    assert _PrivateLint.get_name() == "private_lint"
+
+
+def test_load_plugins_orders_by_priority():
+    """Lower priorities come first and ties keep their configured order."""
+    class FirstPlugin(BasePlugin):
+        """Test plugin."""
+
+    class SecondPlugin(BasePlugin):
+        """Test plugin."""
+
+    class ThirdPlugin(BasePlugin):
+        """Test plugin."""
+
+    manager = PluginManager()
+    for plugin_class in (FirstPlugin, SecondPlugin, ThirdPlugin):
+        manager._discovered_plugins[plugin_class.get_name()] = plugin_class
+
+    loaded = manager.load_plugins({
+        "first": {"priority": 50},
+        "second": {"priority": 10},
+        "third": {"priority": 50},
+    })
+
+    assert list(loaded) == ["second", "first", "third"]
+
+
+def test_plugin_config_is_frozen():
+    """Plugin configs cannot be mutated after construction."""
+    config = PluginConfig(priority=5)
+
+    with pytest.raises(ValidationError):
+        config.priority = 1
+    assert hash(config) == hash(PluginConfig(priority=5))
+
+
+def test_plugin_uses_custom_config_class():
+    """A plugin's get_config_class override is used to build its config."""
+    class CustomConfig(PluginConfig):
+        """Config with an extra field."""
+        level: int = 1
+
+    class ConfiguredPlugin(BasePlugin):
+        """Test plugin."""
+
+        @classmethod
+        def get_config_class(cls):
+            return CustomConfig
+
+    assert ConfiguredPlugin().config == CustomConfig()
+    assert ConfiguredPlugin({"level": 3}).config.level == 3
+
+
+def test_plugin_config_class_may_be_defined_after_plugin():
+    """get_config_class is resolved on first use, not at class definition."""
+    class LatePlugin(BasePlugin):
+        """Test plugin."""
+
+        @classmethod
+        def get_config_class(cls):
+            return LateConfig
+
+    class LateConfig(PluginConfig):
+        """Config defined after the plugin that uses it."""
+        level: int = 2
+
+    class PlainPlugin(LatePlugin):
+        """Subclass falling back to the default config."""
+
+        @classmethod
+        def get_config_class(cls):
+            return PluginConfig
+
+    assert LatePlugin().config == LateConfig()
+    assert type(PlainPlugin().config) is PluginConfig
+    assert type(LatePlugin().config) is LateConfig
@@ -0,0 +1,73 @@
+"""Tests for the ResponseParser."""
+from dataclasses import dataclass
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from apipack.llm.response_parser import ResponseParser
+
+
+class Answer(BaseModel):
+    """Response model used by the tests."""
+    text: str
+    score: int = 0
+
+
+def test_parse_accepts_dicts_and_json():
+    """Decoded and raw JSON responses validate to the same model."""
+    parser = ResponseParser(Answer)
+
+    assert parser.parse({"text": "hi", "score": "3"}) == Answer(text="hi", score=3)
+    assert parser.parse('{"text": "hi", "score": 3}') == Answer(text="hi", score=3)
+
+
+def test_parse_supports_non_model_types():
+    """Types that are not BaseModel subclasses validate through a TypeAdapter."""
+    @dataclass
+    class Point:
+        x: int
+
+    assert ResponseParser(Point).parse({"x": "1"}) == Point(x=1)
+
+
+def test_parse_streaming_response_merges_chunks():
+    """Later chunks override earlier ones when merging generic chunks."""
+    parser = ResponseParser(Answer)
+
+    chunks = [{"text": "a"}, {"score": 2}, {"text": "b"}]
+
+    assert parser.parse_streaming_response(chunks) == Answer(text="b", score=2)
+
+
+def test_parse_streaming_response_joins_delta_content():
+    """Chat-completion deltas are joined and parsed as one JSON document."""
+    parser = ResponseParser(Answer)
+
+    chunks = [
+        {"choices": [{"delta": {"role": "assistant"}}]},
+        {"choices": [{"delta": {"content": '{"text": '}}]},
+        {"choices": [{"delta": {"content": '"hi"}'}}]},
+    ]
+
+    assert parser.parse_streaming_response(chunks) == Answer(text="hi")
+
+
+def test_parse_streaming_response_skips_chunks_without_choices():
+    """Empty leading and choice-less trailing chunks don't break delta joining."""
+    parser = ResponseParser(Answer)
+
+    chunks = [
+        {"choices": []},
+        {"choices": [{"delta": {"content": '{"text": "hi"}'}}]},
+        {"usage": {"total_tokens": 5}},
+    ]
+
+    assert parser.parse_streaming_response(chunks) == Answer(text="hi")
+
+
+def test_parse_reports_validation_errors():
+    """Invalid data raises pydantic's ValidationError from the bound validator."""
+    parser = ResponseParser(Answer)
+
+    with pytest.raises(ValidationError):
+        parser.parse({"score": "not a number"})
@@ -0,0 +1,71 @@
+"""Tests for APIpack settings."""
+import pytest
+
+from apipack.config import settings as settings_module
+from apipack.config.settings import Settings, get_settings, update_settings
+
+
+@pytest.fixture
+def clean_overrides(monkeypatch):
+    """Isolate update_settings() calls from the rest of the suite."""
+    monkeypatch.setattr(settings_module, "_overrides", {})
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_from_env_applies_prefixed_nested_values():
+    """APIPACK_ variables are coerced and routed into nested sections."""
+    settings = Settings._from_env({
+        "APIPACK_DEBUG": "true",
+        "APIPACK_LLM__TEMPERATURE": "0.2",
+        "APIPACK_LLM__MAX_TOKENS": "512",
+        "APIPACK_TEMPLATES__TEMPLATE_DIRS": "a, b",
+        "APIPACK_UNKNOWN": "ignored",
+        "OTHER_DEBUG": "false",
+    })
+
+    assert settings.debug is True
+    assert settings.llm.temperature == 0.2
+    assert settings.llm.max_tokens == 512
+    assert settings.templates.template_dirs == ("a", "b")
+    assert settings.generation is Settings().generation
+
+
+def test_from_env_skips_values_of_the_wrong_shape():
+    """Scalars for sections and sections for scalars are ignored."""
+    settings = Settings._from_env({
+        "APIPACK_LLM__TEMPERATURE": "0.2",
+        "APIPACK_LLM": "x",
+        "APIPACK_TEMPLATES": "y",
+        "APIPACK_DEBUG__Y": "1",
+    })
+
+    assert settings.llm.temperature == 0.2
+    assert settings.templates is Settings().templates
+    assert settings.debug is False
+
+
+def test_get_settings_is_cached_until_updated(clean_overrides):
+    """get_settings() returns one instance until update_settings() runs."""
+    before = get_settings()
+    assert get_settings() is before
+
+    update_settings(debug=True, log_level="DEBUG")
+
+    after = get_settings()
+    assert after.debug is True
+    assert after.log_level == "DEBUG"
+    assert after.llm is before.llm
+    assert get_settings() is after
+
+
+def test_update_settings_rejects_unknown_names(clean_overrides):
+    """A bad name raises and leaves earlier overrides in effect."""
+    update_settings(debug=True)
+
+    with pytest.raises(TypeError):
+        update_settings(bogus=1)
+
+    assert get_settings().debug is True
+    assert "bogus" not in settings_module._overrides
@@ -0,0 +1,248 @@
+"""Tests for the CodeValidator."""
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+from apipack.core.validator import CodeValidator, _attribute_lint_line
+
+SOURCE = '''def f(a, b: int):
+    return a
+
+
+class C:
+    """A class."""
+
+    def m(self) -> None:
+        pass
+'''
+
+
+def test_validate_file_reports_type_hint_and_docstring_errors(tmp_path):
+    """Type hint and docstring checks run against one parsed tree."""
+    path = tmp_path / "module.py"
+    path.write_text(SOURCE)
+
+    results = CodeValidator().validate_file(path)
+
+    assert "syntax" not in results
+    assert results["type_hints"] == [
+        f"Missing return type annotation for function 'f' in {path}:1",
+        f"Missing type annotation for parameter 'a' in function 'f' in {path}:1",
+        f"Missing type annotation for parameter 'self' in function 'm' in {path}:8",
+    ]
+    assert results["docstrings"] == [
+        f"Missing module docstring in {path}",
+        f"Missing function docstring for 'f' in {path}:1",
+        f"Missing function docstring for 'm' in {path}:8",
+    ]
+
+
+def test_validate_file_syntax_error_skips_ast_checks(tmp_path):
+    """A file that does not parse only reports its syntax error."""
+    path = tmp_path / "broken.py"
+    path.write_text("def broken(:\n")
+
+    results = CodeValidator().validate_file(path)
+
+    assert list(results) == ["syntax"]
+    assert results["syntax"][0].startswith(f"Syntax error in {path} at line 1")
+
+
+def test_validate_file_reuses_cached_results(tmp_path):
+    """Unchanged files are served from the on-disk cache."""
+    path = tmp_path / "module.py"
+    path.write_text(SOURCE)
+    config = {"cache_dir": str(tmp_path / "cache")}
+
+    first = CodeValidator(config).validate_file(path)
+    validator = CodeValidator(config)
+    validator._active = ()  # A cache hit never reaches the validators
+    assert validator.validate_file(path) == first
+
+    path.write_text('"""Docs."""\n')
+    assert validator.validate_file(path) == {}
+
+
+def test_validate_directory_parallel_matches_serial(tmp_path):
+    """Process-pool validation returns the same results as serial runs."""
+    for i in range(20):
+        (tmp_path / f"mod_{i}.py").write_text(SOURCE)
+    (tmp_path / "ok.py").write_text('"""Docs."""\n')
+
+    parallel = CodeValidator({"max_workers": 2}).validate_directory(tmp_path)
+    serial = CodeValidator({"parallel": False}).validate_directory(tmp_path)
+
+    assert parallel == serial
+    assert len(parallel) == 20
+
+
+def test_single_ast_check_matches_fused_pass(tmp_path):
+    """Running one AST check alone reports the same errors as the fused pass."""
+    path = tmp_path / "module.py"
+    path.write_text(SOURCE)
+
+    both = CodeValidator().validate_file(path)
+    hints_only = CodeValidator({"disable_docstrings": True}).validate_file(path)
+
+    assert hints_only == {"type_hints": both["type_hints"]}
+
+
+def test_validate_directory_skips_excluded_dirs(tmp_path):
+    """Files under excluded directories such as .venv are not validated."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text(SOURCE)
+    (tmp_path / ".venv").mkdir()
+    (tmp_path / ".venv" / "lib.py").write_text(SOURCE)
+    (tmp_path / "notes.txt").write_text("not python")
+
+    results = CodeValidator().validate_directory(tmp_path)
+
+    assert list(results) == [str(Path("pkg") / "mod.py")]
+
+
+def test_validate_file_honours_source_encoding(tmp_path):
+    """Files are parsed as bytes, so PEP 263 encoding declarations apply."""
+    path = tmp_path / "latin.py"
+    path.write_bytes(b'# -*- coding: latin-1 -*-\n"""Caf\xe9."""\n')
+
+    assert CodeValidator().validate_file(path) == {}
+
+
+def _fake_linter(tmp_path, name, output, returncode):
+    """Write a linter stand-in printing ``output`` formatted with its file args."""
+    script = tmp_path / "bin" / name
+    script.parent.mkdir(exist_ok=True)
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "files = [a for a in sys.argv[1:] if not a.startswith('--')]\n"
+        f"sys.stdout.write({output!r}.format(*files))\n"
+        f"sys.exit({returncode})\n"
+    )
+    script.chmod(0o755)
+    return str(script)
+
+
+def _lint_files(tmp_path):
+    """Create three files to lint, one of them nested."""
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    paths = [
+        tmp_path / "src" / "a.py",
+        tmp_path / "src" / "pkg" / "b.py",
+        tmp_path / "src" / "c.py",
+    ]
+    for path in paths:
+        path.write_text("x = 1\n")
+    return paths
+
+
+def test_lint_batch_splits_pylint_messages_per_file(tmp_path):
+    """Each file gets its own messages; informational ones don't fail it."""
+    a, b, c = _lint_files(tmp_path)
+    linter = _fake_linter(tmp_path, "pylint", (
+        "************* Module a\n"
+        "{0}:1:0: C0114 Missing module docstring (missing-module-docstring)\n"
+        "{1}:2:0: I0021 Useless suppression (useless-suppression)\n"
+    ), 16)
+
+    results = CodeValidator().run_external_linter_batch([a, b, c], linter)
+
+    assert results == {
+        str(a): (False, f"{a}:1:0: C0114 Missing module docstring (missing-module-docstring)"),
+        str(b): (True, f"{b}:2:0: I0021 Useless suppression (useless-suppression)"),
+        str(c): (True, ""),
+    }
+
+
+def test_lint_batch_pylint_usage_error_fails_every_file(tmp_path):
+    """pylint's usage-error bit fails the batch with the unattributed output."""
+    a, b, _ = _lint_files(tmp_path)
+    linter = _fake_linter(tmp_path, "pylint", "usage: pylint [options]\n", 32)
+
+    results = CodeValidator().run_external_linter_batch([a, b], linter)
+
+    assert results == {
+        str(a): (False, "usage: pylint [options]"),
+        str(b): (False, "usage: pylint [options]"),
+    }
+
+
+def test_lint_batch_other_linter_findings_match_single_file(tmp_path):
+    """flake8-style findings fail their file, in batch and single-file runs alike."""
+    a, b, _ = _lint_files(tmp_path)
+    linter = _fake_linter(tmp_path, "flake8", "{0}:1:80: E501 line too long\nstray\n", 1)
+    validator = CodeValidator()
+
+    results = validator.run_external_linter_batch([a, b], linter)
+
+    assert results == {str(a): (False, f"{a}:1:80: E501 line too long"), str(b): (True, "")}
+    assert validator.run_external_linter(a, linter) == results[str(a)]
+
+
+def test_lint_batch_other_linter_crash_fails_every_file(tmp_path):
+    """Exit statuses above 1 mean the linter itself failed."""
+    a, b, _ = _lint_files(tmp_path)
+    linter = _fake_linter(tmp_path, "flake8", "Traceback (most recent call last)\n", 2)
+
+    results = CodeValidator().run_external_linter_batch([a, b], linter)
+
+    assert results[str(a)] == (False, "Traceback (most recent call last)")
+    assert results[str(b)] == (False, "Traceback (most recent call last)")
+
+
+def test_lint_batch_missing_linter_passes(tmp_path):
+    """A linter that isn't installed is reported, not treated as a failure."""
+    a, _, _ = _lint_files(tmp_path)
+    linter = str(tmp_path / "missing-linter")
+
+    results = CodeValidator().run_external_linter_batch([a], linter)
+
+    assert results == {str(a): (True, f"Linter '{linter}' not installed")}
+
+
+def test_validate_directory_reports_linter_findings(tmp_path):
+    """The external_linter option adds failing files' output under ``linter``."""
+    a, _, _ = _lint_files(tmp_path)
+    linter = _fake_linter(tmp_path, "flake8", "{0}:1:1: W291 trailing whitespace\n", 1)
+
+    results = CodeValidator({"external_linter": linter}).validate_directory(tmp_path / "src")
+
+    assert results["a.py"]["linter"] == [f"{a}:1:1: W291 trailing whitespace"]
+    assert not any("linter" in r for path, r in results.items() if path != "a.py")
+
+
+def test_attribute_lint_line_handles_nested_and_colon_paths(tmp_path):
+    """Lines are matched to files by full path, even with ``:`` in it."""
+    nested = str(tmp_path / "pkg" / "sub" / "mod.py")
+    colon = str(tmp_path / "dir:1:x" / "mod.py")
+    by_abspath = {nested: nested, colon: colon}
+
+    def attribute(line):
+        return _attribute_lint_line(line, by_abspath)
+
+    assert attribute(f"{nested}:3:0: C0114 Missing docstring") == (nested, "C0114")
+    assert attribute(f"{colon}:12:4: W0612 Unused variable") == (colon, "W0612")
+    assert attribute(f"{colon}:7: E501 line too long") == (colon, "E501")
+    assert attribute(f"{tmp_path}/other.py:1:0: C0114 x") is None
+    assert attribute("************* Module mod") is None
+
+
+@pytest.mark.skipif(shutil.which("pylint") is None, reason="pylint not installed")
+def test_pylint_msg_template_output_is_attributed(tmp_path):
+    """Real pylint output in the configured template maps back to each file."""
+    nested = tmp_path / "pkg" / "sub" / "clean.py"
+    colon = tmp_path / "dir:1:x" / "messy.py"
+    for path in (nested, colon):
+        path.parent.mkdir(parents=True)
+    nested.write_text('"""Clean module."""\n')
+    colon.write_text("import os\n")
+
+    results = CodeValidator().run_external_linter_batch([nested, colon], "pylint")
+
+    assert results[str(nested)] == (True, "")
+    success, output = results[str(colon)]
+    assert success is False
+    assert f"{colon}:1:0: C0114 " in output
+    assert f"{colon}:1:0: W0611 " in output